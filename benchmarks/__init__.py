@@ -0,0 +1,4 @@
+"""
+Benchmarks on synthetic books (not part of the package), run from the
+repository root, e.g. `python -m benchmarks.serialize` (or `make benchmark`).
+"""
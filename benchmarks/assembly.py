@@ -0,0 +1,65 @@
+"""
+Benchmark how adding the OCR text of a synthetic book scales: with doubling
+numbers of pages (of a few lines each), and with doubling numbers of lines on a
+single page. Pages have no image numbers and lines no IDs, so both are numbered
+by position, which should still take linear time, i.e. about twice as long per
+doubling.
+
+    python -m benchmarks.assembly [--pages N] [--lines N] [--doublings N]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+from .book import make_tei, write_book
+
+
+def assemble(pages, lines, text_only=False):
+    """
+    Time adding the text of a synthetic book (with page and line refs) in seconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        mets = write_book(directory, pages, lines, words=1, line_ids=False, page_numbers=False)
+        tei = make_tei(mets, ('page', 'line'), text_only=text_only)
+        start = time.perf_counter()
+        tei.add_ocr_text(mets)
+        return time.perf_counter() - start
+
+
+def series(title, unit, sizes, measure):
+    """
+    Print the time of each size, per unit and relative to the previous size.
+    """
+    print(title)
+    previous = None
+    for size in sizes:
+        seconds = measure(size)
+        growth = f"x{seconds / previous:.1f}" if previous else ""
+        print(f"  {size:8d} {unit}  {seconds:8.2f} s  {seconds / size * 1e6:8.1f} µs/{unit[:-1]}  {growth}")
+        previous = seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=2000, help="smallest number of pages (of 5 lines)")
+    parser.add_argument('--lines', type=int, default=8000, help="smallest number of lines (on a single page)")
+    parser.add_argument('--doublings', type=int, default=3, help="number of times to double each")
+    args = parser.parse_args()
+
+    # (pages without image numbers are reported one by one)
+    logging.disable(logging.WARNING)
+    scale = [2**doubling for doubling in range(args.doublings + 1)]
+    series("pages of 5 lines", "pages", [args.pages * n for n in scale], lambda pages: assemble(pages, 5))
+    for text_only in (False, True):
+        series(
+            "lines on a single page" + (" (text only)" if text_only else ""),
+            "lines",
+            [args.lines * n for n in scale],
+            lambda lines, text_only=text_only: assemble(1, lines, text_only),
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+A synthetic book for benchmarks: a single div of pages, each an ALTO file with one
+text block of lines, written to a directory and linked via the mappings of a `Mets`.
+"""
+
+import os
+
+from lxml import etree
+
+from mets_mods2tei import Mets, Tei
+from mets_mods2tei.api.util import NS
+
+ALTO = '<alto xmlns="http://www.loc.gov/standards/alto/ns-v4#"><Layout><Page ID="P1"><PrintSpace>{}</PrintSpace></Page></Layout></alto>'
+
+
+def write_book(
+    directory: str, pages: int, lines: int = 30, words: int = 8, line_ids: bool = True, page_numbers: bool = True
+) -> Mets:
+    """
+    Write the ALTO files of a synthetic book into a directory.
+
+    Args:
+        directory (str): Where to write the ALTO files.
+        pages (int): How many pages the book has.
+        lines (int): How many lines each page has (in a single text block).
+        words (int): How many words each line has.
+        line_ids (bool): Whether lines have IDs (else they are numbered by position).
+        page_numbers (bool): Whether pages have image numbers, i.e. positions in the
+            physical structMap (else they are numbered by position in their div).
+
+    Returns:
+        Mets: Mappings of the pages to their ALTO files and (JPEG) images,
+        linked from a single logical div `DIV1`.
+    """
+    mets = Mets()
+    mets.wd = directory
+    alto_map = {}
+    img_map = {}
+    for page in range(pages):
+        text = "".join(
+            '<TextLine{}>{}</TextLine>'.format(
+                f' ID="TL{line}"' if line_ids else "",
+                '<SP/>'.join(f'<String CONTENT="Wort{page}_{line}_{word}"/>' for word in range(words)),
+            )
+            for line in range(lines)
+        )
+        name = f"{page:08d}.xml"
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as file:
+            file.write(ALTO.format(f'<TextBlock ID="TB1">{text}</TextBlock>'))
+        alto_map[f"PHYS_{page:08d}"] = f"file:{name}"
+        img_map[f"PHYS_{page:08d}"] = f"https://example.org/images/{page:08d}.jpg"
+    mets.alto_map = alto_map
+    mets.img_map = img_map
+    mets.page_map = dict.fromkeys(alto_map)
+    if page_numbers:
+        mets.page_index_map = {page_id: num for num, page_id in enumerate(alto_map)}
+    mets.struct_links = {"DIV1": list(alto_map)}
+    return mets
+
+
+def make_tei(mets: Mets, refs: tuple[str, ...] = (), **kwargs) -> Tei:
+    """
+    Create a TEI with the div of a synthetic book in its body (see `write_book`),
+    without adding its text yet.
+
+    Args:
+        mets (Mets): The synthetic book.
+        refs (tuple[str, ...]): Which references to add (`page`, `line`).
+        **kwargs: Options passed on to `Tei`.
+    """
+    tei = Tei(**kwargs)
+    tei.refs = list(refs)
+    body = tei.tree.xpath('//tei:body', namespaces=NS)[0]
+    etree.SubElement(body, f"{{{NS['tei']}}}div").set("id", "DIV1")
+    return tei
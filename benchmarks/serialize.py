@@ -0,0 +1,65 @@
+"""
+Benchmark the TEI serialization of a synthetic book: the former serializer
+(`etree.indent`, then a document-wide search of line breaks to indent the
+text after them), `Tei.tostring` (indenting in a single pass) and its
+compact variant.
+
+    python -m benchmarks.serialize [--pages N] [--lines N] [--words N] [--repeat N]
+"""
+
+import argparse
+import tempfile
+import time
+
+from lxml import etree
+
+from mets_mods2tei.api.util import NS
+
+from .book import make_tei, write_book
+
+XPATH_LB = etree.XPath('//tei:lb', namespaces=NS)
+
+
+def former_tostring(tei):
+    """
+    Serialize a TEI as `Tei.tostring` did before indenting in a single pass.
+    """
+    etree.indent(tei.tree, space="  ")
+    for lb in XPATH_LB(tei.tree):
+        lb.tail += "  " + lb.getparent().text
+    return etree.tostring(tei.tree, pretty_print=True, encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=800, help="number of pages of the book")
+    parser.add_argument('--lines', type=int, default=60, help="number of lines per page")
+    parser.add_argument('--words', type=int, default=8, help="number of words per line")
+    parser.add_argument('--repeat', type=int, default=3, help="number of runs (taking the fastest)")
+    args = parser.parse_args()
+
+    serializers = {
+        'former (etree.indent + lb search)': (former_tostring, {}),
+        'tostring (single pass)': (lambda tei: tei.tostring(), {}),
+        'tostring (compact)': (lambda tei: tei.tostring(), {'compact': True}),
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        mets = write_book(directory, args.pages, args.lines, args.words)
+        print(f"{args.pages} pages of {args.lines} lines of {args.words} words (best of {args.repeat} runs)")
+        results = {}
+        for name, (serialize, options) in serializers.items():
+            times = []
+            for _ in range(args.repeat):
+                # (serializing changes the tree, so each run gets a new one, built as by `convert`)
+                tei = make_tei(mets, ('line',), text_only=True, evict=True, **options)
+                tei.add_ocr_text(mets)
+                start = time.perf_counter()
+                results[name] = serialize(tei)
+                times.append(time.perf_counter() - start)
+            print(f"  {name:<36} {min(times) * 1000:8.1f} ms  {len(results[name]) / 2**20:6.1f} MiB")
+    former, single = list(results.values())[:2]
+    assert former == single, "single-pass indentation differs from etree.indent"
+
+
+if __name__ == '__main__':
+    main()
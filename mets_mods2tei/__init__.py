@@ -1,6 +1,9 @@
 from .api.alto import Alto
+from .api.convert import convert, convert_many
+from .api.heading import HeadingMatcher, LayoutHints
 from .api.mets import Iso15924, Mets
+from .api.session import HttpSession
 from .api.tei import Tei
 from .scripts import cli
 
-__all__ = ['Alto', 'Iso15924', 'Mets', 'Tei', 'cli']
+__all__ = ['Alto', 'HeadingMatcher', 'HttpSession', 'Iso15924', 'LayoutHints', 'Mets', 'Tei', 'cli', 'convert', 'convert_many']
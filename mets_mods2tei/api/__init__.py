@@ -1,5 +1,8 @@
 from .alto import Alto
+from .convert import convert, convert_many
+from .heading import HeadingMatcher, LayoutHints
 from .mets import Iso15924, Mets
+from .session import HttpSession
 from .tei import Tei
 
-__all__ = ['Alto', 'Iso15924', 'Mets', 'Tei']
+__all__ = ['Alto', 'HeadingMatcher', 'HttpSession', 'Iso15924', 'LayoutHints', 'Mets', 'Tei', 'convert', 'convert_many']
@@ -1,20 +1,302 @@
+import functools
 import logging
-import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from itertools import accumulate, chain, compress
+from operator import sub
 from pathlib import Path
 from typing import IO
 
 from lxml import etree
+from rapidfuzz import fuzz, process
 from rapidfuzz.distance import Levenshtein
 
 from .util import NS
 
-norm_alto_ns_re = re.compile(rb'alto/ns-v.#')
-
-XML_PARSER = etree.XMLParser(remove_blank_text=True)
-XPATH_TEXTBLOCK = etree.XPath('//alto:TextBlock', namespaces=NS)
-XPATH_TEXTLINE = etree.XPath('.//alto:TextLine', namespaces=NS)
-XPATH_CONTENTSTRING = etree.XPath('.//alto:String/@CONTENT', namespaces=NS)
+# how many bytes to read (and parse) at once
+CHUNK_SIZE = 65536
+# the elements read in text-only mode (in any namespace)
+TEXT_TAGS = ('{*}TextStyle', '{*}TextBlock', '{*}TextLine')
+# the attributes of text blocks kept in text-only mode
+LAYOUT_ATTRIBUTES = ('HPOS', 'VPOS', 'WIDTH', 'HEIGHT', 'STYLEREFS')
+
+
+@functools.cache
+def _xpaths(namespace: str | None) -> tuple[etree.XPath, etree.XPath, etree.XPath, etree.XPath]:
+    """
+    Compile the XPaths for text blocks, lines, strings and styles of ALTO in a given namespace
+    (so ALTO v2, v3 and v4 can be read as they are).
+    """
+    namespaces = {'alto': namespace} if namespace else None
+    px = 'alto:' if namespace else ''
+    return (
+        etree.XPath(f'//{px}TextBlock', namespaces=namespaces),
+        etree.XPath(f'.//{px}TextLine', namespaces=namespaces),
+        etree.XPath(f'.//{px}String/@CONTENT', namespaces=namespaces),
+        etree.XPath(f'//{px}TextStyle', namespaces=namespaces),
+    )
+
+
+def _namespace(node: etree._Element | etree._ElementTree) -> str | None:
+    """
+    Return the namespace of an element (or of the root of a tree).
+    """
+    if isinstance(node, etree._ElementTree):
+        node = node.getroot()
+    return etree.QName(node).namespace
+
+
+def _font_sizes(styles: Iterable[etree._Element]) -> dict[str, float]:
+    """
+    Return the font sizes of text style elements by their ID (skipping invalid ones).
+    """
+    sizes = {}
+    for style in styles:
+        try:
+            sizes[style.get('ID')] = float(style.get('FONTSIZE'))
+        except (TypeError, ValueError):
+            pass
+    return sizes
+
+
+def _parser() -> etree.XMLParser:
+    """
+    Create a parser for a single ALTO document (so documents can be parsed in parallel).
+    """
+    return etree.XMLParser(remove_blank_text=True)
+
+
+def _pull_events(chunks: Iterable[bytes]) -> Iterator[tuple[str, etree._Element]]:
+    """
+    Parse chunks of bytes incrementally, yielding the start and end events of text styles, blocks and lines.
+    """
+    parser = etree.XMLPullParser(events=('start', 'end'), tag=TEXT_TAGS, remove_blank_text=True)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+XPATH_TEXTBLOCK, XPATH_TEXTLINE, XPATH_CONTENTSTRING, XPATH_TEXTSTYLE = _xpaths(NS['alto'])
 TRANS_TABLE = str.maketrans('', '', '. ')
+# the length of the n-grams which pick the windows to score in fuzzy search
+GRAM_SIZE = 3
+
+
+class TextIndex:
+    """
+    The text of an ALTO page normalized for search (without the characters in
+    `TRANS_TABLE`, or only alphanumeric characters), with a map from raw offsets
+    to normalized ones.
+    """
+
+    __slots__ = ('alnum', 'grams', 'offsets', 'raw', 'text')
+
+    def __init__(self, raw: str, alnum: bool = False) -> None:
+        self.raw = raw
+        self.alnum = alnum
+        self.text = self.normalize(raw)
+        # the normalized offset of each raw offset (and of the end)
+        kept = map(str.isalnum, raw) if alnum else (ord(char) not in TRANS_TABLE for char in raw)
+        self.offsets = array('q', accumulate(kept, initial=0))
+        # the normalized offsets of n-grams searched so far (see `gram_offsets`)
+        self.grams: dict[str, list[int]] = {}
+
+    def normalize(self, text: str) -> str:
+        """
+        Normalize a text like the indexed one.
+        """
+        if self.alnum:
+            return "".join(filter(str.isalnum, text))
+        return text.translate(TRANS_TABLE)
+
+    def locate(self, label: str, start: int = 0) -> tuple[int, int] | None:
+        """
+        Find the first occurrence of the normalized label in the normalized text.
+
+        Args:
+            label (str): The (raw) label to search for.
+            start (int): The raw offset to start searching at.
+
+        Returns:
+            tuple[int, int] | None: The raw offset and length of the occurrence
+            (from its first to its last normalized character), or None.
+        """
+        label = self.normalize(label)
+        if not label or start > len(self.raw):
+            return None
+        found = self.text.find(label, self.offsets[start])
+        if found < 0:
+            return None
+        begin = bisect_right(self.offsets, found) - 1
+        end = bisect_right(self.offsets, found + len(label) - 1)
+        return (begin, end - begin)
+
+    def find(self, label: str, start: int = 0) -> int:
+        """
+        Find the window of the raw text (as long as the raw label) which is
+        closest to the label in Levenshtein distance after normalization.
+
+        Args:
+            label (str): The (raw) label to search for.
+            start (int): The raw offset to start searching at.
+
+        Returns:
+            int: The raw offset of the first exact match, or else of the last
+            window with minimal distance, or -1 if there is no window.
+        """
+        return self.find_all([label], start)[0]
+
+    def find_all(self, labels: Iterable[str], start: int = 0) -> list[int]:
+        """
+        Find several labels at once (like `find`). Exact matches are looked up
+        directly, and the windows worth scoring for a label are picked via the
+        occurrences of its n-grams in the text (see `gram_offsets`, kept for all
+        labels). Only labels which may be as close to any other window have all
+        windows scored (shared between labels of the same length).
+
+        Args:
+            labels (Iterable[str]): The (raw) labels to search for.
+            start (int): The raw offset to start searching at (for each label).
+
+        Returns:
+            list[int]: The raw offset found for each label (or -1).
+        """
+        labels = list(labels)
+        found = {}
+        # the windows of the raw text by width (reversed), once needed
+        windows = {}
+        for label in labels:
+            if label not in found:
+                found[label] = self._find(label, start, windows)
+        return [found[label] for label in labels]
+
+    def gram_offsets(self, gram: str) -> list[int]:
+        """
+        Get the (ascending) normalized offsets of an n-gram in the normalized text
+        (kept for later labels).
+        """
+        if gram not in self.grams:
+            offsets = []
+            found = self.text.find(gram)
+            while found >= 0:
+                offsets.append(found)
+                found = self.text.find(gram, found + 1)
+            self.grams[gram] = offsets
+        return self.grams[gram]
+
+    def _find(self, label: str, start: int, windows: dict[int, list[str]]) -> int:
+        """
+        Find a label (see `find`), keeping the windows of its width if all of them
+        had to be scored.
+        """
+        width = len(label)
+        stop = max(start, len(self.raw) - width)
+        if stop <= start:
+            return -1
+        text = self.text
+        offsets = self.offsets
+        normalized = self.normalize(label)
+        found = self._find_exact(normalized, width, start, stop)
+        if found < 0 and len(normalized) >= GRAM_SIZE:
+            found = self._find_close(normalized, width, start, stop)
+        if found >= 0:
+            return found
+        if width not in windows:
+            # the normalized windows, from the offsets of their raw starts and ends,
+            # in reverse to prefer the last on ties
+            ends = offsets[start + width : stop + width]
+            windows[width] = [text[begin:end] for begin, end in zip(offsets[start:stop], ends)][::-1]
+        reverse = windows[width]
+        # score all windows at once
+        _, _, index = process.extractOne(normalized, reverse, scorer=Levenshtein.distance, score_cutoff=width)
+        return start + len(reverse) - 1 - index
+
+    def _find_exact(self, normalized: str, width: int, start: int, stop: int) -> int:
+        """
+        Find the first window (of the raw starts from `start` to `stop`) which is
+        the normalized label, via its occurrences in the normalized text, or -1.
+        """
+        offsets = self.offsets
+        found = self.text.find(normalized, offsets[start])
+        while 0 <= found <= offsets[stop - 1]:
+            # the windows starting at the occurrence
+            begin = bisect_left(offsets, found, start, stop)
+            while begin < stop and offsets[begin] == found:
+                if offsets[begin + width] == found + len(normalized):
+                    return begin
+                begin += 1
+            found = self.text.find(normalized, found + 1)
+        return -1
+
+    def _find_close(self, normalized: str, width: int, start: int, stop: int) -> int:
+        """
+        Find the last window (of the raw starts from `start` to `stop`) with minimal
+        distance to the normalized label, scoring only windows with enough n-grams of
+        the label, or return -1 if that could miss one.
+
+        A window within distance `d` of the label shares at least
+        `len(normalized) - GRAM_SIZE + 1 - GRAM_SIZE * d` n-grams with it (q-gram lemma).
+        So once some window is known to be that close (at the best partial alignment
+        of the label), all windows with fewer occurrences of its n-grams are farther.
+        """
+        text = self.text
+        offsets = self.offsets
+        alignment = fuzz.partial_ratio_alignment(normalized, text[offsets[start] :])
+        begin = offsets[start] + (alignment.dest_start if alignment else 0)
+        begin = min(bisect_left(offsets, begin, start, stop), stop - 1)
+        best = Levenshtein.distance(normalized, text[offsets[begin] : offsets[begin + width]])
+        needed = len(normalized) - GRAM_SIZE + 1 - GRAM_SIZE * best
+        if needed <= 0:
+            return -1
+        label_grams = {normalized[offset : offset + GRAM_SIZE] for offset in range(len(normalized) - GRAM_SIZE + 1)}
+        # the offsets of all n-grams of the label in the text
+        marks = sorted(chain.from_iterable(map(self.gram_offsets, label_grams)))
+        found = -1
+        # the first of each run of enough marks which fits into a window
+        span = width - GRAM_SIZE
+        for first in compress(range(len(marks)), map(span.__ge__, map(sub, marks[needed - 1 :], marks))):
+            # the windows whose first mark this is
+            low = bisect_right(offsets, marks[first - 1], start, stop) if first else start
+            for begin in range(low, bisect_right(offsets, marks[first], start, stop)):
+                end = offsets[begin + width]
+                if bisect_right(marks, end - GRAM_SIZE, first) - first < needed:
+                    continue
+                distance = Levenshtein.distance(normalized, text[offsets[begin] : end], score_cutoff=best)
+                if distance <= best:
+                    best = distance
+                    found = begin
+        return found
+
+
+class TextLine:
+    """A text line of an ALTO file, as read in text-only mode."""
+
+    __slots__ = ('id', 'text')
+
+    def __init__(self, id_: str, text: str) -> None:
+        self.id = id_
+        self.text = text
+
+
+class TextBlock:
+    """A text block of an ALTO file with its lines and layout, as read in text-only mode."""
+
+    __slots__ = ('attrib', 'id', 'lines')
+
+    def __init__(self, id_: str | None, attrib: dict[str, str] | None = None) -> None:
+        self.id = id_
+        # the `LAYOUT_ATTRIBUTES` of the block
+        self.attrib = attrib or {}
+        self.lines: list[TextLine] = []
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        """
+        Get a layout attribute of the block (like from its element).
+        """
+        return self.attrib.get(key, default)
 
 
 class Alto:
@@ -27,16 +309,102 @@ class Alto:
         Sets up the internal data structures and default values for handling ALTO files.
         """
         self.tree: etree._ElementTree | None = None
+        # the text blocks and the font sizes of the text styles (in text-only mode)
+        self.blocks: list[TextBlock] | None = None
+        self.styles: dict[str, float] | None = None
         self.insert_index: int = 0
         self.last_inserted_elem: etree._Element | None = None
         self.path: str = ""
-        self.text: str = ""
-        self.line_index_struct: dict[int, str] = {}
+        # the texts of all indexed lines (joined on demand)
+        self.line_texts: list[str] = []
+        # the nodes of all indexed lines and their (ascending) start offsets in the text
+        self.line_nodes: list[etree._Element] = []
+        self.line_starts: array = array('q')
         self.line_index: int = 0
+        # the blocks of all indexed lines and their (ascending) start offsets in the text
+        self.block_nodes: list[etree._Element | TextBlock] = []
+        self.block_starts: array = array('q')
+        # the text indexes for search (by case-sensitivity and normalization)
+        self.text_indexes: dict[tuple[bool, bool], TextIndex] = {}
+        # the best insert indexes found (by label, case-sensitivity and start)
+        self.matches: dict[tuple[str, bool, int], tuple[int, int]] = {}
 
         # logging
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def text(self) -> str:
+        """
+        The text of all indexed lines.
+        """
+        if len(self.line_texts) != 1:
+            self.line_texts[:] = ["".join(self.line_texts)]
+        return self.line_texts[0]
+
+    @text.setter
+    def text(self, text: str) -> None:
+        self.line_texts[:] = [text]
+        self.text_indexes.clear()
+        self.matches.clear()
+
+    def text_index(self, lower: bool = False, alnum: bool = False) -> TextIndex:
+        """
+        Get the (cached) index of the text for search.
+
+        Args:
+            lower (bool): Whether to index the lowercase text.
+            alnum (bool): Whether to index only alphanumeric characters
+                (instead of all but those in `TRANS_TABLE`).
+        """
+        if (lower, alnum) not in self.text_indexes:
+            self.text_indexes[lower, alnum] = TextIndex(self.text.lower() if lower else self.text, alnum)
+        return self.text_indexes[lower, alnum]
+
+    def add_line(self, node: etree._Element, text: str) -> None:
+        """
+        Append the text of a line to the page text, indexing the node it belongs to.
+
+        Args:
+            node (etree._Element): The node the line text is attached to.
+            text (str): The (non-empty) line text.
+        """
+        self.line_texts.append(text)
+        self.line_nodes.append(node)
+        self.line_starts.append(self.line_index)
+        self.line_index += len(text)
+        self.text_indexes.clear()
+        self.matches.clear()
+
+    def add_block(self, block: etree._Element | TextBlock) -> None:
+        """
+        Start a new block of lines in the page text (see `add_line`).
+
+        Args:
+            block (etree._Element): The text block element (or record) the next lines belong to.
+        """
+        self.block_nodes.append(block)
+        self.block_starts.append(self.line_index)
+
+    def release(self) -> None:
+        """
+        Drop the ALTO tree (or the records of its blocks) once the text of the page
+        has been indexed, keeping only the text, its lines and the layout of its blocks.
+        """
+        self.styles = self.get_font_sizes()
+        self.block_nodes = [
+            TextBlock(block.get('ID'), {key: block.get(key) for key in LAYOUT_ATTRIBUTES if block.get(key) is not None})
+            for block in self.block_nodes
+        ]
+        self.tree = None
+        self.blocks = []
+
+    def __getstate__(self) -> dict:
+        """
+        Pickle the page without the nodes its lines are attached to (which belong to another
+        tree), e.g. to pass a released page from a worker process (see `release`).
+        """
+        return dict(self.__dict__, line_nodes=[], path=self.path if isinstance(self.path, str) else "")
+
     def write(self, stream: IO) -> None:
         """
         Write the ALTO tree to a stream.
@@ -47,114 +415,251 @@ class Alto:
         stream.write(etree.tostring(self.tree.getroot(), encoding="utf-8"))
 
     @classmethod
-    def read(cls, source: str | IO) -> 'Alto':
+    def read(cls, source: str | IO, text_only: bool = False) -> 'Alto':
         """
         Read an ALTO file from a given source.
 
         Args:
             source: The ALTO file source, which can be a file path or a file-like object.
+            text_only (bool): Whether to read only the text blocks and lines (see `fromfile`).
 
         Returns:
             Alto: An instance of the Alto class.
         """
         if hasattr(source, 'read'):
-            return cls.fromfile(source)
+            return cls.fromfile(source, text_only)
         if Path(source).exists():
             with open(source, 'rb') as f:
-                return cls.fromfile(f)
+                return cls.fromfile(f, text_only)
 
     @classmethod
-    def fromfile(cls, path: str | IO) -> 'Alto':
+    def fromfile(cls, path: str | IO, text_only: bool = False) -> 'Alto':
         """
         Read an ALTO file from a given file path.
 
         Args:
             path (str): The path to the ALTO file.
+            text_only (bool): Whether to read only the text blocks and lines into compact
+                records (`blocks`) while parsing, instead of keeping the full tree.
 
         Returns:
             Alto: An instance of the Alto class.
         """
         instance = cls()
-        instance._fromfile(path)
+        instance._fromfile(path, text_only)
         return instance
 
-    def _fromfile(self, path: str | IO) -> None:
+    def _fromfile(self, path: str | IO, text_only: bool = False) -> None:
         """
         Parse an ALTO file from a given file path.
 
         Args:
             path (str): The path to the ALTO file.
+            text_only (bool): Whether to read only the text blocks and lines.
         """
-        self.tree = etree.XML(norm_alto_ns_re.sub(b"alto/ns-v4#", path.read()), XML_PARSER)
+        if text_only:
+            self._read_text(
+                etree.iterparse(path, events=('start', 'end'), tag=TEXT_TAGS, remove_blank_text=True)
+            )
+        else:
+            self.tree = etree.parse(path, _parser()).getroot()
         self.path = path
 
     @classmethod
-    def frombytes(cls, content):
+    def fromchunks(cls, chunks: Iterable[bytes], text_only: bool = False) -> 'Alto':
+        """
+        Read an ALTO file incrementally from chunks of bytes (e.g. while downloading it).
+
+        Args:
+            chunks (Iterable[bytes]): The consecutive parts of the ALTO file.
+            text_only (bool): Whether to read only the text blocks and lines (see `fromfile`).
+
+        Returns:
+            Alto: An instance of the Alto class.
+        """
+        instance = cls()
+        instance._fromchunks(chunks, text_only)
+        return instance
+
+    def _fromchunks(self, chunks: Iterable[bytes], text_only: bool = False) -> None:
+        """
+        Parse an ALTO file incrementally from chunks of bytes.
+
+        Args:
+            chunks (Iterable[bytes]): The consecutive parts of the ALTO file.
+            text_only (bool): Whether to read only the text blocks and lines.
+        """
+        if text_only:
+            self._read_text(_pull_events(chunks))
+            return
+        parser = _parser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        self.tree = parser.close()
+
+    @classmethod
+    def frombytes(cls, content, text_only=False):
         """
         Reads in ALTO from a given byte string.
         :param bytes content: Content of a ALTO document.
+        :param bool text_only: Whether to read only the text blocks and lines (see `fromfile`).
         """
         i = cls()
-        i._frombytes(content)
+        i._frombytes(content, text_only)
         return i
 
-    def _frombytes(self, content):
+    def _frombytes(self, content, text_only=False):
         """
         Reads in ALTO from a given byte string.
         :param bytes content: Content of a ALTO document.
+        :param bool text_only: Whether to read only the text blocks and lines.
         """
-        self.tree = etree.XML(norm_alto_ns_re.sub(b"alto/ns-v4#", content), XML_PARSER)
+        if text_only:
+            self._read_text(_pull_events([content]))
+        else:
+            self.tree = etree.XML(content, _parser())
+
+    def _read_text(self, events: Iterator[tuple[str, etree._Element]]) -> None:
+        """
+        Read the text styles, blocks and lines from parser events into records,
+        dropping each line (with its strings, glyphs etc.) once read
+        and each block once done.
 
-    def get_text_blocks(self) -> list[etree._Element]:
+        Args:
+            events: The start and end events of the text styles, blocks and lines.
+        """
+        self.blocks = []
+        self.styles = {}
+        # the blocks being read (which do not nest in ALTO, but might)
+        stack = []
+        # how many children of each block were dropped (for the positions of lines without ID)
+        dropped = {}
+        for event, elem in events:
+            tag = elem.tag.rpartition('}')[2]
+            if tag == 'TextStyle':
+                if event == 'end':
+                    self.styles.update(_font_sizes([elem]))
+                    elem.clear()
+            elif tag == 'TextBlock':
+                if event == 'start':
+                    block = TextBlock(elem.get('ID'), {key: elem.get(key) for key in LAYOUT_ATTRIBUTES if key in elem.attrib})
+                    self.blocks.append(block)
+                    stack.append(block)
+                else:
+                    stack.pop()
+                    dropped.pop(elem, None)
+                    elem.clear()
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+            elif event == 'end' and stack:
+                block = elem.getparent()
+                while elem.getprevious() is not None:
+                    del block[0]
+                    dropped[block] = dropped.get(block, 0) + 1
+                position = dropped.get(block, 0)
+                stack[-1].lines.append(TextLine(self.get_line_id(elem, position), self.get_text_in_line(elem)))
+                elem.clear()
+
+    def get_text_blocks(self) -> list[etree._Element] | list[TextBlock]:
         """
         Get all text blocks from the ALTO file.
 
         Returns:
-            List[etree._Element]: A list of text block elements.
+            List[etree._Element]: A list of text block elements (or records in text-only mode).
+        """
+        if self.blocks is not None:
+            return self.blocks
+        return _xpaths(_namespace(self.tree))[0](self.tree)
+
+    def get_font_sizes(self) -> dict[str, float]:
+        """
+        Get the font sizes of the text styles in the ALTO file.
+
+        Returns:
+            dict[str, float]: The font size of each text style (by ID) which has a valid one.
         """
-        return XPATH_TEXTBLOCK(self.tree)
+        if self.styles is not None:
+            return self.styles
+        return _font_sizes(_xpaths(_namespace(self.tree))[3](self.tree))
 
-    def get_lines_in_text_block(self, text_block: etree._Element) -> list[etree._Element]:
+    def get_lines_in_text_block(
+        self, text_block: etree._Element | TextBlock
+    ) -> list[etree._Element] | list[TextLine]:
         """
         Get all lines in a given text block.
 
         Args:
-            text_block (etree._Element): The text block element.
+            text_block (etree._Element): The text block element (or record).
 
         Returns:
-            List[etree._Element]: A list of line elements.
+            List[etree._Element]: A list of line elements (or records).
         """
-        return XPATH_TEXTLINE(text_block)
+        if isinstance(text_block, TextBlock):
+            return text_block.lines
+        return _xpaths(_namespace(text_block))[1](text_block)
 
-    def get_text_in_line(self, line: etree._Element) -> str:
+    def get_text_in_line(self, line: etree._Element | TextLine) -> str:
         """
         Get the text content of a given line.
 
         Args:
-            line (etree._Element): The line element.
+            line (etree._Element): The line element (or record).
 
         Returns:
             str: The text content of the line.
         """
-        text = ' '.join(XPATH_CONTENTSTRING(line))
+        if isinstance(line, TextLine):
+            return line.text
+        text = ' '.join(_xpaths(_namespace(line))[2](line))
         if len(line) and etree.QName(line[-1]).localname == 'HYP':
             text += line[-1].get("CONTENT")
         return text
 
-    def __compute_fuzzy_distance(self, text1: str, text2: str) -> int:
+    def get_line_id(self, line: etree._Element | TextLine, position: int | None = None) -> str:
+        """
+        Get the ID of a given line, or else an ID made up of the ID of its block
+        and its position therein.
+
+        Args:
+            line (etree._Element): The line element (or record).
+            position (int): The position of the line in its block, if already
+                known (else it is looked up, if needed).
+
+        Returns:
+            str: The ID of the line.
         """
-        Compute the fuzzy distance between two strings.
+        if isinstance(line, TextLine):
+            return line.id
+        line_id = line.get("ID")
+        if not line_id:
+            block = line.getparent()
+            if position is None:
+                position = block.index(line)
+            line_id = f"{block.get('ID')}_{position:04d}"
+        return line_id
+
+    def get_line_ids(self, lines: list[etree._Element] | list[TextLine]) -> list[str]:
+        """
+        Get the IDs of some lines (see `get_line_id`), numbering those without an ID
+        in a single pass over each of their blocks (instead of a search per line).
 
         Args:
-            text1 (str): The first string.
-            text2 (str): The second string.
+            lines (list): The line elements (or records), e.g. of a text block.
 
         Returns:
-            int: The Levenshtein distance between the two strings.
+            list[str]: The IDs of the lines.
         """
-        text1 = text1.translate(TRANS_TABLE)
-        text2 = text2.translate(TRANS_TABLE)
-        return Levenshtein.distance(text1, text2)
+        positions = {}
+        line_ids = []
+        for line in lines:
+            if isinstance(line, TextLine) or line.get("ID"):
+                line_ids.append(self.get_line_id(line))
+                continue
+            block = line.getparent()
+            if block not in positions:
+                positions[block] = {child: num for num, child in enumerate(block)}
+            line_ids.append(self.get_line_id(line, positions[block][line]))
+        return line_ids
 
     def get_best_insert_index(self, label: str, lower: bool = False) -> int:
         """
@@ -167,26 +672,33 @@ class Alto:
         Returns:
             int: The best insert index.
         """
-        if lower:
-            text = self.text.lower()
-            label = label.lower()
-        else:
-            text = self.text
-
-        if len(label) >= len(text):
-            return (0, len(text))
-        minimum = len(label)
-        index = -1
-        # the moving window
-        for k in range(self.insert_index, len(text) - len(label)):
-            distance = self.__compute_fuzzy_distance(label, text[k : k + len(label)])
-            if distance <= minimum:
-                minimum = distance
-                index = k
-                self.logger.debug(f"New best match at index {index}: {text[index : index + len(label)].strip()}")
-            if distance == 0:
-                break
-        return (index, len(text[index : index + len(label)].strip()))
+        return self.get_best_insert_indexes([label], lower)[0]
+
+    def get_best_insert_indexes(self, labels: Iterable[str], lower: bool = False) -> list[tuple[int, int]]:
+        """
+        Get the best insert indexes for several labels (e.g. of all divs starting
+        on this page) at once, each searched from `insert_index` (see `TextIndex.find_all`).
+        Results are kept for later calls (until the text changes).
+
+        Args:
+            labels (Iterable[str]): The labels to find the best insert indexes for.
+            lower (bool): Whether to convert the labels to lowercase.
+
+        Returns:
+            list[tuple[int, int]]: The best insert index and match length for each label.
+        """
+        labels = [(label.lower() if lower else label, lower, self.insert_index) for label in labels]
+        missing = [key[0] for key in labels if key not in self.matches]
+        if missing:
+            index = self.text_index(lower)
+            text = index.raw
+            for label, begin in zip(missing, index.find_all(missing, self.insert_index)):
+                if len(label) >= len(text):
+                    self.matches[label, lower, self.insert_index] = (0, len(text))
+                    continue
+                self.logger.debug(f"Best match at index {begin}: {text[begin : begin + len(label)].strip()}")
+                self.matches[label, lower, self.insert_index] = (begin, len(text[begin : begin + len(label)].strip()))
+        return [self.matches[key] for key in labels]
 
     def collect_text_nodes(self, begin, length):
         """
@@ -197,17 +709,19 @@ class Alto:
         """
         pars = []
         lines = []
-        # iterate over all positions in the match and collect the lines and pars they are in
-        for i in range(begin, begin + length):
-            line = self.line_index_struct[i]
-            if (not lines) or lines[-1] != line:
-                lines.append(line)
-                # move all lines of the match to a single paragraph
-                par = line.getparent()
-                if not pars:
-                    pars.append(par)
-                if pars[0] != par:
-                    pars[0].append(line)
-                    if len(par) == 0:
-                        par.getparent().remove(par)
+        if length <= 0:
+            return (pars, lines)
+        # look up the lines containing the first and the last position of the match
+        first = bisect_right(self.line_starts, begin) - 1
+        last = bisect_right(self.line_starts, begin + length - 1) - 1
+        for line in self.line_nodes[max(first, 0) : last + 1]:
+            lines.append(line)
+            # move all lines of the match to a single paragraph
+            par = line.getparent()
+            if not pars:
+                pars.append(par)
+            if pars[0] != par:
+                pars[0].append(line)
+                if len(par) == 0:
+                    par.getparent().remove(par)
         return (pars, lines)
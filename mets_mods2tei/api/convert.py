@@ -0,0 +1,103 @@
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from .heading import HeadingMatcher
+from .mets import Mets
+from .session import HttpSession
+from .tei import Tei
+
+
+def convert(
+    source: str,
+    ocr: bool = False,
+    refs: list[str] | None = None,
+    text_group: str = 'FULLTEXT',
+    img_group: str = 'DEFAULT',
+    session: HttpSession | None = None,
+    prefetch: int = 0,
+    matcher: HeadingMatcher | None = None,
+    output: IO[bytes] | None = None,
+    compact: bool = False,
+    processes: int = 0,
+) -> bytes | None:
+    """
+    Convert a METS file or URL to TEI.
+
+    Relative file references are resolved against the location of the METS
+    itself, without changing the working directory, so this is safe to call
+    from several threads at once.
+
+    Args:
+        source (str): Path or URL of the METS/MODS XML to convert.
+        ocr (bool): Whether to serialize the ALTO full-text into the TEI.
+        refs (list[str]): Which references to add (`page` and/or `line`).
+        text_group (str): File group which contains the full-text.
+        img_group (str): File group which contains the images.
+        session (HttpSession): Session for fetching remote ALTO files
+            (defaults to a new one for this conversion).
+        prefetch (int): How many ALTO files to fetch concurrently
+            before adding their text (0 for one after another).
+        matcher (HeadingMatcher): Strategy for locating the headings of divs
+            in the full-text (defaults to fuzzy search only).
+        output (IO[bytes]): Binary file to stream the TEI serialization to,
+            one top-level div at a time (see `Tei.write`).
+        compact (bool): Whether to serialize without indentation.
+        processes (int): How many worker processes read the ALTO files and build
+            their pages (0 for none, see `Tei.add_ocr_text`).
+
+    Returns:
+        bytes | None: The TEI serialization (or None if streamed to `output`).
+    """
+    try:
+        f = urlopen(source)
+    except (ValueError, URLError):
+        f = open(source, "rb")  # noqa: SIM115
+
+    mets = Mets()
+    mets.fulltext_group_name = text_group
+    mets.image_group_name = img_group
+    with f as mets_file:
+        mets.fromfile(mets_file)
+
+    # the ALTO trees are not needed afterwards, nor the pages once added
+    tei = Tei(text_only=True, matcher=matcher, evict=True, compact=compact)
+    tei.fill_from_mets(mets, ocr, refs=refs, session=session, prefetch=prefetch, output=output, processes=processes)
+    if output is None:
+        return tei.tostring()
+    return None
+
+
+def convert_many(
+    sources: Iterable[str], max_workers: int | None = None, session: HttpSession | None = None, **kwargs
+) -> Iterator[tuple[str, bytes | Exception]]:
+    """
+    Convert many METS files or URLs to TEI concurrently in a thread pool.
+
+    Args:
+        sources (Iterable[str]): Paths or URLs of the METS/MODS XML to convert.
+        max_workers (int): Number of threads (defaults to the executor's choice).
+        session (HttpSession): Session for fetching remote ALTO files, shared
+            by all conversions (defaults to a new one for all of them).
+        **kwargs: Options passed on to `convert`.
+
+    Yields:
+        tuple[str, bytes | Exception]: Each source with its TEI serialization,
+        or the exception raised when converting it, in input order.
+    """
+    if session is None:
+        # as many connections per host as concurrent fetches (by default as many threads as the executor's)
+        workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        with HttpSession(pool_size=workers * max(kwargs.get('prefetch', 0), 1)) as own_session:
+            yield from convert_many(sources, max_workers, own_session, **kwargs)
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(source, executor.submit(convert, source, session=session, **kwargs)) for source in sources]
+        for source, future in futures:
+            try:
+                yield source, future.result()
+            except Exception as err:  # noqa: BLE001
+                yield source, err
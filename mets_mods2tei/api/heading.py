@@ -0,0 +1,315 @@
+import logging
+import statistics
+import threading
+import weakref
+from bisect import bisect_left
+from collections.abc import Iterable
+
+from rapidfuzz.distance import Levenshtein
+
+from .alto import Alto
+
+#: the tiers of heading matching, from the cheapest to the most expensive (see `HeadingMatcher`)
+TIERS = ('exact', 'normalized', 'fuzzy')
+
+
+def _float(value: str | None) -> float | None:
+    """
+    Return a layout attribute as a number, or None if missing or invalid.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class LayoutHints:
+    """
+    A detector of the text blocks of a page likely to hold headings, from its layout:
+
+    - the `top` blocks (by vertical position, or else in reading order)
+    - blocks with a larger font than most of the page (by font size of their
+      text style, or else by their height per line), by a factor of `font_ratio`
+    - short blocks (of at most `max_lines` lines with text)
+
+    Headings are first searched in these blocks only, accepting fuzzy
+    matches within `max_distance` (relative to the length of the label).
+    """
+
+    def __init__(self, top: int = 3, font_ratio: float = 1.2, max_lines: int = 2, max_distance: float = 0.25) -> None:
+        """
+        Initialize the detector.
+
+        Args:
+            top (int): How many of the topmost blocks are candidates.
+            font_ratio (float): How much larger than the median font size of
+                the page the font of a block must be to make it a candidate.
+            max_lines (int): How many lines with text a block may have at most to make
+                it a candidate for being short (0 for none).
+            max_distance (float): The largest Levenshtein distance of a fuzzy
+                match in the candidate blocks, relative to the length of the label.
+        """
+        if not 0 <= max_distance <= 1:
+            raise ValueError(f"Relative distance {max_distance} out of range [0, 1]")
+        self.top = top
+        self.font_ratio = font_ratio
+        self.max_lines = max_lines
+        self.max_distance = max_distance
+
+    def candidates(self, alto: Alto) -> list[tuple[int, int]]:
+        """
+        Find the candidate blocks of a page.
+
+        Args:
+            alto (Alto): The page (with its blocks and lines indexed, or released).
+
+        Returns:
+            list[tuple[int, int]]: The start and end offsets of the candidate blocks
+            in the text, in reading order.
+        """
+        ends = [*alto.block_starts[1:], alto.line_index]
+        styles = alto.get_font_sizes()
+        blocks = []
+        for num, (block, begin, end) in enumerate(zip(alto.block_nodes, alto.block_starts, ends)):
+            if begin == end:
+                # no text
+                continue
+            # (the lines with text)
+            lines = bisect_left(alto.line_starts, end) - bisect_left(alto.line_starts, begin)
+            # the font size (style) or else the line height (geometry), compared separately
+            size = next((('style', styles[ref]) for ref in (block.get('STYLEREFS') or '').split() if ref in styles), None)
+            if size is None:
+                height = _float(block.get('HEIGHT'))
+                if height is not None:
+                    size = ('height', height / max(lines, 1))
+            position = _float(block.get('VPOS'))
+            blocks.append((begin, end, lines, size, num if position is None else position))
+        sizes = {}
+        for *_, size, _ in blocks:
+            if size is not None:
+                sizes.setdefault(size[0], []).append(size[1])
+        thresholds = {kind: self.font_ratio * statistics.median(values) for kind, values in sizes.items()}
+        top = set(sorted(range(len(blocks)), key=lambda num: blocks[num][4])[: self.top])
+        return [
+            (begin, end)
+            for num, (begin, end, lines, size, _) in enumerate(blocks)
+            if num in top or lines <= self.max_lines or (size is not None and size[1] > thresholds[size[0]])
+        ]
+
+
+class HeadingMatcher:
+    """
+    A strategy for locating the labels of divs (their headings) in the text
+    of their first page, trying several tiers one after another until one
+    of them finds the label:
+
+    - `exact`: the label is a substring of the page text
+    - `normalized`: the label is a substring of the page text after removing
+      everything but alphanumeric characters from both
+    - `fuzzy`: the window of the page text (as long as the label) closest to
+      the label in Levenshtein distance (ignoring spaces and dots), if that
+      distance is within `max_distance`
+
+    If no tier finds the label, then its heading is not placed.
+
+    With `layout` hints, the tiers are first tried on the candidate blocks of
+    the page only (each on its own, so no match spans two blocks), and on
+    the full page only if none finds the label there.
+
+    Counts how many labels each tier found (and how many none did),
+    also when shared between threads (e.g. by `convert_many`).
+    """
+
+    def __init__(
+        self,
+        tiers: Iterable[str] = ('fuzzy',),
+        max_distance: float = 1.0,
+        ignore_case: bool = True,
+        layout: LayoutHints | None = None,
+    ) -> None:
+        """
+        Initialize the matcher.
+
+        Args:
+            tiers (Iterable[str]): Which of the `TIERS` to try, in this order.
+            max_distance (float): The largest Levenshtein distance of a fuzzy
+                match, relative to the length of the label (1.0 accepts any).
+            ignore_case (bool): Whether to compare label and text in lowercase.
+            layout (LayoutHints): Detector of the blocks to search first (if any).
+        """
+        self.tiers = tuple(tiers)
+        for tier in self.tiers:
+            if tier not in TIERS:
+                raise ValueError(f"Unknown heading matching tier '{tier}', expected one of {TIERS}")
+        if not 0 <= max_distance <= 1:
+            raise ValueError(f"Relative distance {max_distance} out of range [0, 1]")
+        self.max_distance = max_distance
+        self.ignore_case = ignore_case
+        self.layout = layout
+        self._hits = dict.fromkeys((*TIERS, 'none'), 0)
+        self._lock = threading.Lock()
+        # the candidate blocks of each page (see `__candidates`)
+        self._candidates = weakref.WeakKeyDictionary()
+
+        # logging
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Return how many labels each tier found, and how many remained unmatched (`none`).
+        """
+        with self._lock:
+            return dict(self._hits)
+
+    @property
+    def indexes(self) -> list[tuple[bool, bool]]:
+        """
+        Return which text indexes of a page (by case-sensitivity and normalization, see `Alto.text_index`)
+        the tiers search.
+        """
+        return sorted({(self.ignore_case, tier == 'normalized') for tier in self.tiers})
+
+    def prepare(self, alto: Alto, labels: Iterable[str]) -> None:
+        """
+        Search the labels of all divs starting on a page at once, so far as
+        they need the fuzzy tier (see `Alto.get_best_insert_indexes`).
+        """
+        if 'fuzzy' not in self.tiers:
+            return
+        labels = list(labels)
+        if self.layout is not None:
+            candidates = self.__candidates(alto)
+            for block, _ in candidates:
+                self.__prepare(block, labels)
+            labels = [label for label in labels if self.__find_blocks(candidates, label) is None]
+        self.__prepare(alto, labels)
+
+    def __prepare(self, alto, labels):
+        """
+        Search the labels which need the fuzzy tier in a text at once.
+        """
+        cheaper = self.tiers[: self.tiers.index('fuzzy')]
+        pending = [label for label in labels if all(self.__search(tier, alto, label) is None for tier in cheaper)]
+        if pending:
+            alto.get_best_insert_indexes(pending, self.ignore_case)
+
+    def match(self, alto: Alto, label: str) -> tuple[int, int] | None:
+        """
+        Find a label in the text of a page, starting at its `insert_index`.
+
+        Args:
+            alto (Alto): The page (with its text indexed).
+            label (str): The label to find.
+
+        Returns:
+            tuple[int, int] | None: The offset and length of the label in the
+            text, or None if no tier found it.
+        """
+        if self.layout is not None:
+            found = self.__find_blocks(self.__candidates(alto), label)
+            if found is not None:
+                tier, (block, start), (begin, length) = found
+                # map back to the page
+                found = (start + begin, min(length, block.line_index - begin))
+                self.__count(tier)
+                self.logger.debug("Found heading '%s' at index %d (%s, in candidate blocks)", label, found[0], tier)
+                return found
+        found = self.__find(alto, label, self.max_distance)
+        if found is not None:
+            tier, found = found
+            self.__count(tier)
+            self.logger.debug("Found heading '%s' at index %d (%s)", label, found[0], tier)
+            return found
+        self.__count('none')
+        self.logger.debug("Cannot find heading '%s'", label)
+        return None
+
+    def __count(self, tier):
+        """
+        Count a label found by a tier (or by `none`).
+        """
+        with self._lock:
+            self._hits[tier] += 1
+
+    def __candidates(self, alto):
+        """
+        Return the candidate blocks of a page, each as an `Alto` of its own
+        (with its text as single line) along with its offset in the page.
+        """
+        if alto not in self._candidates:
+            candidates = []
+            for begin, end in self.layout.candidates(alto):
+                begin = max(begin, alto.insert_index)
+                if begin < end:
+                    block = Alto()
+                    block.add_line(None, alto.text[begin:end])
+                    candidates.append((block, begin))
+            self._candidates[alto] = candidates
+        return self._candidates[alto]
+
+    def __find_blocks(self, candidates, label):
+        """
+        Find a label in the candidate blocks of a page via the first tier
+        which finds it in any of them: in the first block (in reading order)
+        for the exact and normalized tiers, and in the block with the closest
+        match for the fuzzy tier. Return the tier, the candidate and the offset
+        and length of the label in its block, or None.
+        """
+        max_distance = self.layout.max_distance
+        for tier in self.tiers:
+            hits = []
+            for candidate in candidates:
+                found = self.__search(tier, candidate[0], label, max_distance)
+                if found is None:
+                    continue
+                if tier != 'fuzzy':
+                    return tier, candidate, found
+                hits.append((self.__distance(candidate[0], label, found[0]), len(hits), candidate, found))
+            if hits:
+                _, _, candidate, found = min(hits)
+                return tier, candidate, found
+        return None
+
+    def __find(self, alto, label, max_distance):
+        """
+        Find a label in the text of a page via the first tier which finds it.
+        Return the tier and the offset and length of the label, or None.
+        """
+        for tier in self.tiers:
+            found = self.__search(tier, alto, label, max_distance)
+            if found is not None:
+                return tier, found
+        return None
+
+    def __search(self, tier, alto, label, max_distance=1.0):
+        """
+        Find a label in the text of a page via a single tier.
+        """
+        if tier == 'fuzzy':
+            begin, length = alto.get_best_insert_index(label, self.ignore_case)
+            if begin < 0:
+                return None
+            if max_distance < 1 and self.__distance(alto, label, begin) > max_distance * len(label):
+                return None
+            return (begin, length)
+        if self.ignore_case:
+            label = label.lower()
+        if tier == 'normalized':
+            return alto.text_index(self.ignore_case, alnum=True).locate(label, alto.insert_index)
+        label = label.strip()
+        begin = alto.text_index(self.ignore_case).raw.find(label, alto.insert_index) if label else -1
+        if begin < 0:
+            return None
+        return (begin, len(label))
+
+    def __distance(self, alto, label, begin):
+        """
+        Return the Levenshtein distance between a label and the window of the
+        page text (as long as the label) at an offset, after normalization.
+        """
+        index = alto.text_index(self.ignore_case)
+        if self.ignore_case:
+            label = label.lower()
+        window = index.normalize(index.raw[begin : begin + len(label)])
+        return Levenshtein.distance(index.normalize(label), window)
@@ -1,18 +1,411 @@
 import csv
+import functools
+import io
 import logging
 import os
+import sys
+from array import array
+from collections.abc import Callable, Iterator, Mapping, MutableMapping
+from datetime import datetime
 from pathlib import Path
-from typing import IO, Any
+from typing import IO, Any, ClassVar
+from urllib.parse import urlparse
 
 import babel
 from lxml import etree
 
-from .mets_generateds import parseString as parse_mets
-from .mods_generateds import parseString as parse_mods
 from .util import NS, PX, resource_filename
 
+#: the supported engines for reading METS/MODS (see `Mets`)
+ENGINES = ('generateds', 'lxml')
+
+# like generateDS' own parser: ignore comments and processing instructions
+XML_PARSER = etree.ETCompatXMLParser()
 XPATH_FILE_GRP = etree.XPath("//mets:fileGrp[@USE=$use]", namespaces=NS)
 XPATH_STRUCTLINK_CHILDREN = etree.XPath("//mets:structLink/*", namespaces=NS)
+# for the lxml engine (relative to mets:mets)
+XPATH_DMD_DATA = etree.XPath("mets:dmdSec[1]/mets:mdWrap/mets:xmlData/*[1]", namespaces=NS)
+XPATH_RIGHTS_DATA = etree.XPath("mets:amdSec[1]/mets:rightsMD[1]/mets:mdWrap/mets:xmlData/*[1]", namespaces=NS)
+XPATH_STRUCT_MAP_DIV = etree.XPath("mets:structMap[@TYPE=$type][1]/mets:div", namespaces=NS)
+XPATH_SOFTWARE_AGENT = etree.XPath(
+    "mets:metsHdr/mets:agent[@TYPE='OTHER'][@OTHERTYPE='SOFTWARE']", namespaces=NS
+)
+# for the lxml engine (relative to mods:mods)
+XPATH_MODS_SERIES = etree.XPath("mods:relatedItem[@type='series']", namespaces=NS)
+XPATH_MODS_LICENSE = etree.XPath("mods:accessCondition[@type='use and reproduction']", namespaces=NS)
+
+
+@functools.cache
+def _generateds():
+    """
+    Import the generateDS object models for METS and MODS (on first use only,
+    so the `lxml` engine does not need to load them).
+    """
+    from . import mets_generateds, mods_generateds
+
+    class _XmlData(mets_generateds.xmlDataType):
+        """
+        The METS xmlData wrapper, keeping its content (MODS, DV rights etc.)
+        as lxml elements instead of serializing them to strings.
+        """
+
+        def gds_build_any(self, node, type_name=None):
+            return node
+
+    mets_generateds.xmlDataType.subclass = _XmlData
+    return mets_generateds, mods_generateds
+
+
+@functools.cache
+def _iso15924() -> dict[str, str]:
+    """
+    Load the ISO 15924 script codes and their English names (once per process).
+    """
+    with open(resource_filename('mets_mods2tei', 'data/iso15924-utf8-20180827.txt')) as filep:
+        reader = csv.DictReader(
+            filter(lambda row: row[0] != '#', filep),
+            delimiter=';',
+            quoting=csv.QUOTE_NONE,
+            fieldnames=['code', 'index', 'name_eng', 'name_fr', 'alias', 'Age', 'Date'],
+        )
+        return {row['code']: row['name_eng'] for row in reader}
+
+
+@functools.cache
+def _language_names() -> dict[str, str]:
+    """
+    Load the precompiled German names of the language codes known to babel
+    (once per process, see `make language-names`).
+    """
+    with open(resource_filename('mets_mods2tei', 'data/language-names-de.txt'), encoding='utf-8') as filep:
+        return dict(line.rstrip('\n').split('\t', 1) for line in filep if line[0] != '#')
+
+
+@functools.lru_cache(maxsize=1024)
+def _babel_language_name(code: str) -> str | None:
+    """
+    Look up the German name of a language code in babel's locale data
+    (or None if babel does not know it, which is cached as well).
+    """
+    try:
+        return babel.Locale.parse(code).get_language_name('de')
+    except babel.core.UnknownLocaleError:
+        return None
+
+
+def _write_language_names(filep: IO[str]) -> None:
+    """
+    Write the German names of all language codes (and aliases) known to babel
+    as a tab-separated table, for `_language_names`.
+    """
+    from babel.core import get_global
+
+    filep.write(f"# German names of language codes, generated with babel {babel.__version__}\n")
+    for code in sorted(set(get_global('language_aliases')) | set(babel.Locale('en').languages)):
+        name = _babel_language_name(code)
+        if name:
+            filep.write(f"{code}\t{name}\n")
+
+
+def _language_name(code: str) -> str | None:
+    """
+    Return the German name of a language code (or None if it is unknown).
+    """
+    name = _language_names().get(code)
+    if name is None:
+        name = _babel_language_name(code)
+    return name
+
+
+def _text(node: etree._Element) -> str:
+    """
+    Return the text content of an element, without that of its sub-elements
+    (like `get_valueOf_()` of the generateDS objects).
+    """
+    return (node.text or '') + ''.join(child.tail or '' for child in node)
+
+
+def _parse_datetime(value: str) -> datetime:
+    """
+    Parse an xsd:dateTime (like the generateDS objects).
+    """
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+
+class _Div:
+    """
+    A `mets:div` element for the `lxml` engine, with the same getters
+    as the generateDS object.
+    """
+
+    __slots__ = ('node',)
+
+    def __init__(self, node: etree._Element) -> None:
+        self.node = node
+
+    def get_ID(self) -> str | None:
+        return self.node.get('ID')
+
+    def get_TYPE(self) -> str | None:
+        return self.node.get('TYPE')
+
+    def get_LABEL(self) -> str | None:
+        return self.node.get('LABEL')
+
+    def get_ORDERLABEL(self) -> str | None:
+        return self.node.get('ORDERLABEL')
+
+    def get_ADMID(self) -> str | None:
+        return self.node.get('ADMID')
+
+    def get_DMDID(self) -> str | None:
+        return self.node.get('DMDID')
+
+    def get_ORDER(self) -> int | None:
+        order = self.node.get('ORDER')
+        return int(order) if order is not None else None
+
+    def get_div(self) -> list['_Div']:
+        return [_Div(div) for div in self.node.iterchildren(f"{PX['mets']}div")]
+
+    def get_fptr(self) -> list['_Fptr']:
+        return [_Fptr(fptr) for fptr in self.node.iterchildren(f"{PX['mets']}fptr")]
+
+
+class _Fptr:
+    """
+    A `mets:fptr` element for the `lxml` engine, with the same getters
+    as the generateDS object.
+    """
+
+    __slots__ = ('node',)
+
+    def __init__(self, node: etree._Element) -> None:
+        self.node = node
+
+    def get_FILEID(self) -> str | None:
+        return self.node.get('FILEID')
+
+
+class PageTable:
+    """
+    The physical pages of a METS, one row per page.
+
+    Page IDs are interned and indexed, so rows can be found by ID in O(1).
+    The page data is stored column-wise (by row): the position of the page
+    in the physical structMap (`index`, -1 for pages only known from a
+    mapping), its ORDER (`order`, 0 if unset), and its `div`, ORDERLABEL
+    (`orderlabel`), image href (`img`) and ALTO href (`alto`), if any.
+    As pages are added in physical order, pages can also be found by
+    position in O(1) via `at`. Values are written via `set`, which keeps
+    count of the set values per column (so columns know their length).
+    """
+
+    #: the value of unset entries in the integer columns
+    UNSET: ClassVar[dict[str, int]] = {'index': -1, 'order': 0}
+
+    def __init__(self) -> None:
+        self.ids: list[str] = []
+        self.rows: dict[str, int] = {}
+        self.positions: array = array('l')
+        self.index: array = array('l')
+        self.order: array = array('l')
+        self.div: list[Any] = []
+        self.orderlabel: list[str] = []
+        self.img: list[str] = []
+        self.alto: list[str] = []
+        self.counts: dict[str, int] = dict.fromkeys(('index', 'order', 'div', 'orderlabel', 'img', 'alto'), 0)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, page_id: str, index: int = -1) -> int:
+        """
+        Return the row of a page, adding it if necessary.
+
+        Args:
+            page_id (str): The ID of the physical page.
+            index (int): Its position in the physical structMap (if known).
+        """
+        row = self.rows.get(page_id)
+        if row is None:
+            row = len(self.ids)
+            page_id = sys.intern(page_id)
+            self.ids.append(page_id)
+            self.rows[page_id] = row
+            self.index.append(-1)
+            self.order.append(0)
+            for column in (self.div, self.orderlabel, self.img, self.alto):
+                column.append(_UNSET)
+        if index >= 0:
+            self.set('index', row, index)
+            if index == len(self.positions):
+                self.positions.append(row)
+        return row
+
+    def set(self, column: str, row: int, value: Any) -> None:
+        """
+        Set the value of a row in a column (unsetting it, if `value` is the unset value of the column).
+        """
+        data = getattr(self, column)
+        self.counts[column] += (not self.is_unset(column, value)) - (not self.is_unset(column, data[row]))
+        data[row] = value
+
+    def is_unset(self, column: str, value: Any) -> bool:
+        """
+        Return whether a value of a column is unset.
+        """
+        if column in self.UNSET:
+            return value == self.UNSET[column]
+        return value is _UNSET
+
+    def get(self, column: str, page_id: str, default: Any = None) -> Any:
+        """
+        Return the value of a page in a column (or `default` if unset).
+        """
+        row = self.rows.get(page_id)
+        if row is None:
+            return default
+        value = getattr(self, column)[row]
+        if self.is_unset(column, value):
+            return default
+        return value
+
+    def at(self, index: int) -> str:
+        """
+        Return the ID of the page at a position in the physical structMap.
+        """
+        return self.ids[self.positions[index]]
+
+    def column(self, column: str) -> 'PageColumn':
+        """
+        Return a column as mapping of page IDs to their (set) values.
+        """
+        return PageColumn(self, column)
+
+
+class _Unset:
+    """
+    The value of unset entries in the object columns of a `PageTable`.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return '<unset>'
+
+
+_UNSET = _Unset()
+
+
+class PageColumn(MutableMapping):
+    """
+    A column of a `PageTable` as mapping of page IDs to their values,
+    containing the pages with a value (in the order of the table).
+    """
+
+    __slots__ = ('column', 'data', 'table', 'unset')
+
+    def __init__(self, table: PageTable, column: str) -> None:
+        self.table = table
+        self.column = column
+        self.data = getattr(table, column)
+        self.unset = table.UNSET.get(column, _UNSET)
+
+    def __getitem__(self, page_id: str) -> Any:
+        value = self.data[self.table.rows[page_id]]
+        if self.table.is_unset(self.column, value):
+            raise KeyError(page_id)
+        return value
+
+    def __setitem__(self, page_id: str, value: Any) -> None:
+        self.table.set(self.column, self.table.add(page_id), value)
+
+    def __delitem__(self, page_id: str) -> None:
+        if page_id not in self:
+            raise KeyError(page_id)
+        self.table.set(self.column, self.table.rows[page_id], self.unset)
+
+    def __iter__(self) -> Iterator[str]:
+        column = self.column
+        is_unset = self.table.is_unset
+        return (page_id for page_id, value in zip(self.table.ids, self.data) if not is_unset(column, value))
+
+    def __len__(self) -> int:
+        return self.table.counts[self.column]
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def clear(self) -> None:
+        for row in range(len(self.data)):
+            self.data[row] = self.unset
+        self.table.counts[self.column] = 0
+
+
+class _PageMap:
+    """
+    A mapping attribute of `Mets` backed by a column of its page table.
+    Assigning a mapping replaces the column contents.
+    """
+
+    def __init__(self, column: str) -> None:
+        self.column = column
+
+    def __get__(self, mets: 'Mets | None', owner: type | None = None) -> 'PageColumn | _PageMap':
+        if mets is None:
+            return self
+        return mets.pages.column(self.column)
+
+    def __set__(self, mets: 'Mets', mapping: Mapping[str, Any]) -> None:
+        column = mets.pages.column(self.column)
+        column.clear()
+        column.update(mapping)
+
+
+class _Lazy:
+    """
+    An attribute of `Mets` read on first access by a `method`, which sets it
+    (along with the other attributes of its group) as instance attribute.
+    Until a METS has been read, it is set to `default()` (or None) instead.
+    """
+
+    def __init__(self, method: Callable[['Mets'], None] | None = None, default: Callable[[], Any] | None = None) -> None:
+        self.method = method
+        self.default = default
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, mets: 'Mets | None', owner: type | None = None) -> Any:
+        if mets is None:
+            return self
+        if self.method is None or mets.mets is None:
+            mets.__dict__[self.name] = self.default() if self.default else None
+        else:
+            self.method(mets)
+        return mets.__dict__[self.name]
+
+
+class _PerEngine:
+    """
+    A method of `Mets` with one implementation per engine (see `ENGINES`),
+    dispatching to the one for the engine of the instance. Also callable
+    with the instance as first argument (e.g. as method of `_Lazy`).
+    """
+
+    def __init__(self, **methods: Callable[..., Any]) -> None:
+        self.methods = methods
+
+    def __get__(self, mets: 'Mets | None', owner: type | None = None) -> Any:
+        if mets is None:
+            return self
+        return self.methods[mets.engine].__get__(mets, owner)
+
+    def __call__(self, mets: 'Mets', *args: Any) -> Any:
+        return self.methods[mets.engine](mets, *args)
 
 
 class Iso15924:
@@ -22,18 +415,10 @@ class Iso15924:
         """
         Initialize the Iso15924 instance.
 
-        Loads the ISO 15924 script codes and their English names into a map.
+        Uses the ISO 15924 script codes and their English names as a map
+        (loaded once and shared by all instances in the process).
         """
-        self.map: dict[str, str] = {}
-        with open(resource_filename('mets_mods2tei', 'data/iso15924-utf8-20180827.txt')) as filep:
-            reader = csv.DictReader(
-                filter(lambda row: row[0] != '#', filep),
-                delimiter=';',
-                quoting=csv.QUOTE_NONE,
-                fieldnames=['code', 'index', 'name_eng', 'name_fr', 'alias', 'Age', 'Date'],
-            )
-            for row in reader:
-                self.map[row['code']] = row['name_eng']
+        self.map: dict[str, str] = _iso15924()
 
     def get(self, code: str) -> str:
         """
@@ -51,87 +436,87 @@ class Iso15924:
 class Mets:
     """A class to handle METS (Metadata Encoding and Transmission Standard) files."""
 
-    def __init__(self) -> None:
+    #: the physical pages' div, position, ORDER, ORDERLABEL, image and ALTO href by page ID
+    #: (views of the columns of `pages`)
+    page_map = _PageMap('div')
+    page_index_map = _PageMap('index')
+    order_map = _PageMap('order')
+    orderlabel_map = _PageMap('orderlabel')
+    img_map = _PageMap('img')
+    alto_map = _PageMap('alto')
+
+    #: default engine for reading METS/MODS
+    engine: str = 'generateds'
+    #: default for reading the fileSec, physical structMap and structLink incrementally
+    streaming: bool = False
+
+    def __init__(self, engine: str | None = None, streaming: bool | None = None) -> None:
         """
         Initialize the Mets instance.
 
         Sets up the internal data structures and default values for handling METS files.
-        """
-        self.script_iso: Iso15924 = Iso15924()
+
+        Args:
+            engine (str): How to read METS/MODS: `generateds` builds the full generateDS
+                object model, `lxml` reads only the required fields from the lxml tree
+                (in which case `mets` and `mods` are the lxml elements).
+                Defaults to the class attribute `engine`.
+            streaming (bool): Whether to consume the fileSec, the physical structMap and the
+                structLink while parsing, dropping their elements right away, so memory does
+                not grow with the size of these sections (but then the tree lacks them).
+                Defaults to the class attribute `streaming`.
+        """
+        if engine is not None:
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown METS engine '{engine}', expected one of {ENGINES}")
+            self.engine = engine
+        if streaming is not None:
+            self.streaming = streaming
         self.tree: etree._ElementTree | None = None
+        # base directory or URL to resolve relative file references against
         self.wd: str = os.getcwd()
         self.mets: Any | None = None
         self.mods: Any | None = None
-        self.page_map: dict[str, Any] = {}
-        self.page_index_map: dict[str, int] = {}
-        self.order_map: dict[str, str] = {}
-        self.orderlabel_map: dict[str, str] = {}
-        self.img_map: dict[str, str] = {}
-        self.alto_map: dict[str, str] = {}
-        self.struct_links: dict[str, list[str]] = {}
         self.fulltext_group_name: str = 'FULLTEXT'
         self.image_group_name: str = 'DEFAULT'
 
-        self.title: str | None = None
-        self.sub_titles: list[str] | None = None
-        self.part_titles: dict[str, str] | None = None
-        self.volume_titles: dict[str, str] | None = None
-        self.authors: list[dict[str, str]] | None = None
-        self.editors: list[dict[str, str]] | None = None
-        self.places: list[dict[str, str]] | None = None
-        self.dates: dict[str, str] | None = None
-        self.notes: list[str] | None = None
-        self.publishers: list[str] | None = None
-        self.edition: str | None = None
-        self.digital_origin: str | None = None
-        self.owner_digital: str | None = None
-        self.license: str | None = None
-        self.license_url: str | None = None
-        self.encoding_date: str | None = None
-        self.encoding_desc: str | None = None
-        self.location_phys: str | None = None
-        self.location_urls: list[str] | None = None
-        self.shelf_locators: list[str] | None = None
-        self.identifiers: dict[str, str] | None = None
-        self.scripts: list[str] | None = None
-        self.collections: list[str] | None = None
-        self.languages: dict[str, str] | None = None
-        self.classifications: dict[str, list[str]] | None = None
-        self.subjects: dict[str, list[str]] | None = None
-        self.extents: list[str] | None = None
         self.series: list[str] | None = None
 
         # Logging
         self.logger: logging.Logger = logging.getLogger(__name__)
 
     @classmethod
-    def read(cls, source: str | IO) -> 'Mets':
+    def read(cls, source: str | IO, engine: str | None = None, streaming: bool | None = None) -> 'Mets':
         """
         Read a METS file from a given source.
 
         Args:
             source: The METS file source, which can be a file path or a file-like object.
+            engine (str): How to read METS/MODS (see `Mets`).
+            streaming (bool): Whether to read large sections incrementally (see `Mets`).
 
         Returns:
             Mets: An instance of the Mets class.
         """
         if hasattr(source, 'read'):
-            return cls.from_file(source)
+            return cls.from_file(source, engine=engine, streaming=streaming)
         if Path(source).exists():
-            return cls.from_file(source)
+            return cls.from_file(source, engine=engine, streaming=streaming)
 
     @classmethod
-    def from_file(cls, path: str | IO) -> 'Mets':
+    def from_file(cls, path: str | IO, engine: str | None = None, streaming: bool | None = None) -> 'Mets':
         """
         Read a METS file from a given file path.
 
         Args:
             path (str): The path to the METS file.
+            engine (str): How to read METS/MODS (see `Mets`).
+            streaming (bool): Whether to read large sections incrementally (see `Mets`).
 
         Returns:
             Mets: An instance of the Mets class.
         """
-        instance = cls()
+        instance = cls(engine=engine, streaming=streaming)
         instance.fromfile(path)
         return instance
 
@@ -143,33 +528,145 @@ class Mets:
             path (str): The path to the METS file.
         """
         if hasattr(path, 'read'):
-            if hasattr(path, 'name'):
+            if urlparse(getattr(path, 'url', None) or '').scheme:
+                # download stream: resolve relative FLocat refs against its URL
+                self.wd = path.url
+            elif hasattr(path, 'name'):
                 # open file
-                self.wd = os.path.dirname(path.name)
+                self.wd = os.path.dirname(os.path.abspath(path.name))
             else:
-                # download stream
+                # in-memory stream
                 pass  # keep cwd
         else:
-            self.wd = os.path.dirname(path)
-        self.tree = etree.parse(path)
+            self.wd = os.path.dirname(os.path.abspath(path))
+        # forget any data read before
+        self.mets = None
+        for name, attr in vars(Mets).items():
+            if isinstance(attr, _Lazy) and attr.method is not None:
+                self.__dict__.pop(name, None)
+        if self.streaming:
+            self.pages = PageTable()
+            self.struct_links = {}
+            self.tree = etree.ElementTree(self.__iterparse(path))
+        else:
+            self.tree = etree.parse(path, XML_PARSER)
         root = self.tree.getroot()
         if root.tag != PX['mets'] + 'mets':
             root = root.find('.//mets:mets', namespaces=NS)
-        self.mets = parse_mets(etree.tostring(root), silence=True)
-        mods = "<mods/>"
+        self.__build(root)
+
+    def __build_generateds(self, root: etree._Element) -> None:
+        """
+        Build the METS and MODS objects from the parsed elements.
+        """
+        mets_generateds, mods_generateds = _generateds()
+        # build the object trees directly from the parsed elements (no re-serialization)
+        self.mets = mets_generateds.mets.factory().build(root)
+        self.mods = mods_generateds.modsDefinition.factory()
         if ((dmd_sec := self.mets.get_dmdSec()) and
             (dmd_wrap := dmd_sec[0].get_mdWrap()) and
             (dmd_data := dmd_wrap.get_xmlData()) and
             (dmd_objs := dmd_data.get_anytypeobjs_())):
-            mods = dmd_objs[0]
-        self.mods = parse_mods(mods, silence=True)
-        self.__spur()
+            _, mods_class = mods_generateds.get_root_tag(dmd_objs[0])
+            self.mods = (mods_class or mods_generateds.modsDefinition).factory()
+            self.mods.build(dmd_objs[0], gds_collector_=mods_generateds.GdsCollector_())
 
-    def __spur(self) -> None:
+    def __build_lxml(self, root: etree._Element) -> None:
         """
-        Perform the initial interpretation of the METS/MODS file.
+        Keep the METS and MODS elements as they are.
+        """
+        self.mets = root
+        dmd_objs = XPATH_DMD_DATA(root)
+        self.mods = dmd_objs[0] if dmd_objs else etree.Element(f"{PX['mods']}mods")
+
+    __build = _PerEngine(generateds=__build_generateds, lxml=__build_lxml)
 
-        This method extracts and organizes metadata from the METS/MODS file.
+    def __iterparse(self, path: str | IO) -> etree._Element:
+        """
+        Parse a METS file incrementally, reading the files, physical pages and
+        struct links as soon as their elements are complete, then removing them.
+
+        Returns:
+            the root element of the remaining tree
+        """
+        if isinstance(path, io.TextIOBase):
+            # iterparse needs bytes
+            path = getattr(path, 'buffer', None) or io.BytesIO(path.read().encode('utf-8'))
+        mets_ = PX['mets']
+        file_maps = {self.image_group_name: {}, self.fulltext_group_name: {}}
+        page_struct = None
+        idx = 0
+        context = etree.iterparse(
+            path,
+            tag=(f"{mets_}file", f"{mets_}div", "{*}smLink"),
+            remove_comments=True,
+            remove_pis=True,
+        )
+        for _, elem in context:
+            if elem.tag == f"{mets_}file":
+                file_map = file_maps.get(elem.getparent().get('USE'))
+                if file_map is not None:
+                    self.__add_file(elem, file_map)
+            elif elem.tag == f"{mets_}div":
+                struct_map = elem.getparent().getparent()
+                if struct_map is None or struct_map.tag != f"{mets_}structMap" or struct_map.get('TYPE') != "PHYSICAL":
+                    continue
+                # only the first physical structMap (like `get_page_structure`)
+                if page_struct is None:
+                    page_struct = elem.getparent()
+                elif page_struct is not elem.getparent():
+                    continue
+                self.__add_page(idx, _Div(elem), file_maps[self.fulltext_group_name], file_maps[self.image_group_name])
+                idx += 1
+                for fptr in elem.findall(f"{mets_}fptr"):
+                    elem.remove(fptr)
+            else:
+                self.__add_struct_link(elem)
+            elem.getparent().remove(elem)
+        return context.root
+
+    def __add_file(self, entry: etree._Element, file_map: dict[str, str]) -> None:
+        """
+        Add the location of a `mets:file` to the map of its file group.
+        """
+        url = entry.find(f"{PX['mets']}FLocat").get(PX['xlink'] + "href")
+        self.logger.debug("Found file: %s", url)
+        file_map[entry.get("ID")] = url
+
+    def __add_page(self, idx: int, div: Any, fulltext_map: dict[str, str], image_map: dict[str, str]) -> None:
+        """
+        Add a physical page `div` (at position `idx`) and its files to the mappings.
+        """
+        page = div.get_ID()
+        self.logger.debug("Found physical page: %s", page)
+        pages = self.pages
+        row = pages.add(page, idx)
+        pages.set('div', row, div)
+        if div.get_ORDER():
+            pages.set('order', row, div.get_ORDER())
+        if div.get_ORDERLABEL():
+            pages.set('orderlabel', row, div.get_ORDERLABEL())
+        for fptr in div.get_fptr():
+            if fptr.get_FILEID() in fulltext_map:
+                pages.set('alto', row, fulltext_map[fptr.get_FILEID()])
+            elif fptr.get_FILEID() in image_map:
+                pages.set('img', row, image_map[fptr.get_FILEID()])
+
+    def __add_struct_link(self, sm_link: etree._Element) -> None:
+        """
+        Add a `mets:smLink` to the struct links (if it points to a page with full-text).
+        """
+        logical = sm_link.get(PX['xlink'] + "from")
+        physical = sm_link.get(PX['xlink'] + "to")
+        row = self.pages.rows.get(physical)
+        if row is not None and self.pages.alto[row] is not _UNSET:
+            self.logger.debug("Found structLink from %s to physical page: %s", logical, physical)
+            pages = self.struct_links.setdefault(logical, [])
+            pages.append(self.pages.ids[row])
+
+    def __read_level(self) -> None:
+        """
+        Read the publication level (and the title of the top-level logical div, as a fallback).
         """
         #
         # get publication level
@@ -238,6 +735,11 @@ class Mets:
                 # ? or 'MS' # monograph within series
                 # ? or 'MMS' # monograph within multi-volume monograph series
 
+    def __read_titles_generateds(self) -> None:
+        """
+        Read the main, sub, part and volume titles and the publication level.
+        """
+        self.__read_level()
         #
         # titleInfo (main, sub, part/volume)
         self.sub_titles = []  # subtitle (mods:titleInfo[mods:subTitle]
@@ -275,6 +777,50 @@ class Mets:
                 )
                 self.volume_titles[order, typ] = val
 
+    def __read_titles_lxml(self) -> None:
+        """
+        Read the main, sub, part and volume titles and the publication level.
+        """
+        self.__read_level()
+        mods_ = PX['mods']
+        self.sub_titles = []
+        self.part_titles = {}
+        self.volume_titles = {}
+        title_infos = self.mods.findall(f"{mods_}titleInfo")
+        if title_infos:
+
+            def norm_title_first(title_info):
+                if title_info.get('type', 'simple') == 'simple':
+                    return -1
+                if title_info.get('type') == 'uniform':
+                    return 0
+                return 1
+
+            title_info = min(title_infos, key=norm_title_first)
+            title = title_info.find(f"{mods_}title")
+            if title is not None:
+                self.title = _text(title).strip()
+            for sub_title in title_info.iterchildren(f"{mods_}subTitle"):
+                self.sub_titles.append(_text(sub_title).strip())
+            for part_number, part_name in zip(
+                title_info.iterchildren(f"{mods_}partNumber"), title_info.iterchildren(f"{mods_}partName")
+            ):
+                self.part_titles[_text(part_number).strip()] = _text(part_name).strip()
+        part_info = self.mods.find(f"{mods_}part")
+        if part_info is not None:
+            order = str(int(part_info.get('order') or 0))
+            for detail in part_info.iterchildren(f"{mods_}detail"):
+                val = ', '.join(
+                    _text(title).strip()
+                    for tag in ('number', 'caption', 'title')
+                    for title in detail.iterchildren(f"{mods_}{tag}")
+                )
+                self.volume_titles[order, detail.get('type')] = val
+
+    def __read_names_generateds(self) -> None:
+        """
+        Read the authors and editors.
+        """
         #
         # authors and editors
         self.authors = []
@@ -294,12 +840,44 @@ class Mets:
                 elif role.get_valueOf_() == "aut":
                     self.authors.append((typ, person))
 
+    def __read_names_lxml(self) -> None:
+        """
+        Read the authors and editors.
+        """
+        mods_ = PX['mods']
+        self.authors = []
+        self.editors = []
+        for name in self.mods.iterchildren(f"{mods_}name"):
+            typ = name.get('type', 'simple')
+            person = {name_part.get('type'): _text(name_part) for name_part in name.iterchildren(f"{mods_}namePart")}
+            role = name.find(f"{mods_}role")
+            for role_term in role.iterchildren(f"{mods_}roleTerm") if role is not None else []:
+                if _text(role_term) == "edt":
+                    self.editors.append((typ, person))
+                elif _text(role_term) == "aut":
+                    self.authors.append((typ, person))
+
+    def __read_notes_generateds(self) -> None:
+        """
+        Read the notes.
+        """
         notes = self.mods.get_note()
         if notes:
             self.notes = [note.get_valueOf_() for note in notes]
         else:
             self.notes = []
 
+    def __read_notes_lxml(self) -> None:
+        """
+        Read the notes.
+        """
+        mods_ = PX['mods']
+        self.notes = [_text(note) for note in self.mods.iterchildren(f"{mods_}note")]
+
+    def __read_origin_generateds(self) -> None:
+        """
+        Read the publication places, dates and publishers and the edition.
+        """
         #
         # orgin info
         origin_info = self.mods.get_originInfo()
@@ -331,6 +909,36 @@ class Mets:
         if origin_info and origin_info[0].get_edition():
             self.edition = origin_info[0].get_edition()[0].get_valueOf_()
 
+    def __read_origin_lxml(self) -> None:
+        """
+        Read the publication places, dates and publishers and the edition.
+        """
+        mods_ = PX['mods']
+        origin_info = self.mods.find(f"{mods_}originInfo")
+        self.places = []
+        self.dates = {}
+        self.publishers = []
+        self.edition = ""
+        if origin_info is not None:
+            for place in origin_info.iterchildren(f"{mods_}place"):
+                self.places.append(
+                    {
+                        place_term.get('type') or 'text': _text(place_term)
+                        for place_term in place.iterchildren(f"{mods_}placeTerm")
+                    }
+                )
+            for date_issued in origin_info.iterchildren(f"{mods_}dateIssued"):
+                self.dates[date_issued.get('point', "unspecified")] = _text(date_issued)
+            for publisher in origin_info.iterchildren(f"{mods_}publisher"):
+                self.publishers.append(_text(publisher))
+            edition = origin_info.find(f"{mods_}edition")
+            if edition is not None:
+                self.edition = _text(edition)
+
+    def __read_languages_generateds(self) -> None:
+        """
+        Read the languages and scripts.
+        """
         #
         # languages and scripts
         languages = self.mods.get_language()
@@ -339,13 +947,7 @@ class Mets:
         self.scripts = []
         for language in languages:
             for language_term in language.get_languageTerm():
-                try:
-                    self.languages[language_term.get_valueOf_()] = babel.Locale.parse(
-                        language_term.get_valueOf_()
-                    ).get_language_name('de')
-                except babel.core.UnknownLocaleError as err:
-                    self.logger.error(f"{err}. Falling back to 'Unbekannt'")
-                    self.languages[language_term.get_valueOf_()] = "Unbekannt"
+                self.languages[language_term.get_valueOf_()] = self.__language_name(language_term.get_valueOf_())
             for script_term in language.get_scriptTerm():
                 self.scripts.append(self.script_iso.get(script_term.get_valueOf_()))
         if not self.languages:
@@ -353,6 +955,27 @@ class Mets:
         if not self.scripts:
             self.scripts.append(self.script_iso.get('Unknown'))
 
+    def __read_languages_lxml(self) -> None:
+        """
+        Read the languages and scripts.
+        """
+        mods_ = PX['mods']
+        self.languages = {}
+        self.scripts = []
+        for language in self.mods.iterchildren(f"{mods_}language"):
+            for language_term in language.iterchildren(f"{mods_}languageTerm"):
+                self.languages[_text(language_term)] = self.__language_name(_text(language_term))
+            for script_term in language.iterchildren(f"{mods_}scriptTerm"):
+                self.scripts.append(self.script_iso.get(_text(script_term)))
+        if not self.languages:
+            self.languages['mis'] = 'Unkodiert'
+        if not self.scripts:
+            self.scripts.append(self.script_iso.get('Unknown'))
+
+    def __read_subjects_generateds(self) -> None:
+        """
+        Read the classifications and subjects.
+        """
         #
         # classifications and subjects
         classifications = self.mods.get_classification()
@@ -373,6 +996,24 @@ class Mets:
                 for temporal in subject.temporal:
                     keywords.append(('temporal', temporal.get_valueOf_()))
 
+    def __read_subjects_lxml(self) -> None:
+        """
+        Read the classifications and subjects.
+        """
+        mods_ = PX['mods']
+        self.classifications = {}
+        for classification in self.mods.iterchildren(f"{mods_}classification"):
+            self.classifications.setdefault(classification.get('authority'), []).append(_text(classification))
+        self.subjects = {}
+        for subject in self.mods.iterchildren(f"{mods_}subject"):
+            keywords = self.subjects.setdefault(subject.get('authority'), [])
+            for tag in ('topic', 'geographic', 'temporal'):
+                keywords.extend((tag, _text(keyword)) for keyword in subject.iterchildren(f"{mods_}{tag}"))
+
+    def __read_physical_generateds(self) -> None:
+        """
+        Read the digital origin and extent.
+        """
         #
         # physical description
         physical_description = self.mods.get_physicalDescription()
@@ -388,6 +1029,24 @@ class Mets:
             for extent in physical_description[0].get_extent():
                 self.extents.append(extent.get_valueOf_())
 
+    def __read_physical_lxml(self) -> None:
+        """
+        Read the digital origin and extent.
+        """
+        mods_ = PX['mods']
+        physical_description = self.mods.find(f"{mods_}physicalDescription")
+        self.digital_origin = ""
+        self.extents = []
+        if physical_description is not None:
+            digital_origin = physical_description.find(f"{mods_}digitalOrigin")
+            if digital_origin is not None:
+                self.digital_origin = digital_origin.text
+            self.extents = [_text(extent) for extent in physical_description.iterchildren(f"{mods_}extent")]
+
+    def __read_rights_generateds(self) -> None:
+        """
+        Read the owner and license of the digital edition.
+        """
         #
         # dv FIXME: replace with generated code as soon as schema is available
         owner = None
@@ -397,7 +1056,7 @@ class Mets:
             (rightsmd_wrap := rightsmd[0].get_mdWrap()) and
             (rightsmd_data := rightsmd_wrap.get_xmlData()) and
             (rightsmd_objs := rightsmd_data.get_anytypeobjs_())):
-            dv = etree.fromstring(rightsmd_objs[0])
+            dv = rightsmd_objs[0]
             owner = dv.find('dv:owner', namespaces=NS)
             license_node = dv.find('dv:license', namespaces=NS)
 
@@ -418,6 +1077,30 @@ class Mets:
                     self.license = license_node.get_valueOf_()
                     self.license_url = license_node.get_href() if license_node.get_href() else ""
 
+    def __read_rights_lxml(self) -> None:
+        """
+        Read the owner and license of the digital edition.
+        """
+        owner = None
+        license_node = None
+        rights_objs = XPATH_RIGHTS_DATA(self.mets)
+        if rights_objs:
+            owner = rights_objs[0].find('dv:owner', namespaces=NS)
+            license_node = rights_objs[0].find('dv:license', namespaces=NS)
+        self.owner_digital = owner.text if owner is not None else ""
+        self.license = ""
+        self.license_url = ""
+        if license_node is not None:
+            self.license = license_node.text
+        else:
+            for license_node in XPATH_MODS_LICENSE(self.mods):
+                self.license = _text(license_node)
+                self.license_url = license_node.get('href') or ""
+
+    def __read_header_generateds(self) -> None:
+        """
+        Read the encoding date and description.
+        """
         #
         # metsHdr
         header = self.mets.get_metsHdr()
@@ -433,7 +1116,26 @@ class Mets:
         else:
             self.encoding_date = None
             self.encoding_desc = None
+        self.__finish_header()
+
+    def __read_header_lxml(self) -> None:
+        """
+        Read the encoding date and description.
+        """
+        header = self.mets.find(f"{PX['mets']}metsHdr")
+        if header is not None:
+            create_date = header.get('CREATEDATE')
+            self.encoding_date = _parse_datetime(create_date) if create_date else None
+            self.encoding_desc = [agent.findtext(f"{PX['mets']}name") for agent in XPATH_SOFTWARE_AGENT(self.mets)]
+        else:
+            self.encoding_date = None
+            self.encoding_desc = None
+        self.__finish_header()
 
+    def __finish_header(self) -> None:
+        """
+        Format the encoding date and pick the first encoding description.
+        """
         if self.encoding_date:
             self.encoding_date = self.encoding_date.isoformat()
         else:
@@ -444,6 +1146,12 @@ class Mets:
         else:
             self.logger.warning("Found no mets:agent for encodingDesc")
 
+    def __read_location_generateds(self) -> None:
+        """
+        Read the location of the manuscript.
+        """
+        self.location_phys = None
+        self.location_urls = None
         #
         # location of manuscript
 
@@ -460,6 +1168,28 @@ class Mets:
             if location.get_url():
                 self.location_urls = [url.get_valueOf_() for url in location.get_url()]
 
+    def __read_location_lxml(self) -> None:
+        """
+        Read the location of the manuscript.
+        """
+        self.location_phys = None
+        self.location_urls = None
+        mods_ = PX['mods']
+        self.shelf_locators = []
+        location = self.mods.find(f"{mods_}location")
+        if location is not None:
+            self.shelf_locators.extend(_text(shelf) for shelf in location.iterchildren(f"{mods_}shelfLocator"))
+            physical_location = location.find(f"{mods_}physicalLocation")
+            if physical_location is not None:
+                self.location_phys = _text(physical_location)
+            urls = [_text(url) for url in location.iterchildren(f"{mods_}url")]
+            if urls:
+                self.location_urls = urls
+
+    def __read_identifiers_generateds(self) -> None:
+        """
+        Read the identifiers (URN, VD ID etc.).
+        """
         #
         # URN and VD ID
         self.identifiers = {}
@@ -468,6 +1198,19 @@ class Mets:
             for identifier in identifiers:
                 self.identifiers[identifier.get_type()] = identifier.get_valueOf_()
 
+    def __read_identifiers_lxml(self) -> None:
+        """
+        Read the identifiers (URN, VD ID etc.).
+        """
+        mods_ = PX['mods']
+        self.identifiers = {
+            identifier.get('type'): _text(identifier) for identifier in self.mods.iterchildren(f"{mods_}identifier")
+        }
+
+    def __read_collections_generateds(self) -> None:
+        """
+        Read the collections (from relatedItem).
+        """
         #
         # collections (from relatedItem)
         self.collections = []
@@ -477,6 +1220,24 @@ class Mets:
             if title:
                 self.collections.append(title[0].get_valueOf_())
 
+    def __read_collections_lxml(self) -> None:
+        """
+        Read the collections (from relatedItem).
+        """
+        mods_ = PX['mods']
+        self.collections = []
+        for collection in XPATH_MODS_SERIES(self.mods):
+            title_info = collection.find(f"{mods_}titleInfo")
+            title = title_info.find(f"{mods_}title") if title_info is not None else None
+            if title is not None:
+                self.collections.append(_text(title))
+
+    def __read_pages(self) -> None:
+        """
+        Read the file groups, physical pages and struct links.
+        """
+        self.pages = PageTable()
+        self.struct_links = {}
         #
         # file groups
 
@@ -484,48 +1245,83 @@ class Mets:
         fulltext_map = {}
         fulltext_group = XPATH_FILE_GRP(self.tree, use=self.fulltext_group_name)
         if len(fulltext_group):
-            fulltext_map = {}
             for entry in fulltext_group[0].findall(f"{PX['mets']}file"):
-                url = entry.find(f"{PX['mets']}FLocat").get(PX['xlink'] + "href")
-                self.logger.debug("Found full-text file: %s", url)
-                fulltext_map[entry.get("ID")] = url
+                self.__add_file(entry, fulltext_map)
 
         # image
         image_map = {}
         image_group = XPATH_FILE_GRP(self.tree, use=self.image_group_name)
         if len(image_group):
             for entry in image_group[0].findall(f"{PX['mets']}file"):
-                url = entry.find(f"{PX['mets']}FLocat").get(PX['xlink'] + "href")
-                self.logger.debug("Found image file: %s", url)
-                image_map[entry.get("ID")] = url
+                self.__add_file(entry, image_map)
 
         # struct map physical
         page_struct = self.get_page_structure()
         if page_struct:
             for idx, div in enumerate(page_struct.get_div()):
-                page = div.get_ID()
-                self.logger.debug("Found physical page: %s", page)
-                self.page_map[page] = div
-                self.page_index_map[page] = idx
-                if div.get_ORDER():
-                    self.order_map[page] = div.get_ORDER()
-                if div.get_ORDERLABEL():
-                    self.orderlabel_map[page] = div.get_ORDERLABEL()
-                for fptr in div.get_fptr():
-                    if fptr.get_FILEID() in fulltext_map:
-                        self.alto_map[page] = fulltext_map[fptr.get_FILEID()]
-                    elif fptr.get_FILEID() in image_map:
-                        self.img_map[page] = image_map[fptr.get_FILEID()]
+                self.__add_page(idx, div, fulltext_map, image_map)
 
         # struct links
-        structlinks = XPATH_STRUCTLINK_CHILDREN(self.tree)
-        for sm_link in structlinks:
-            logical = sm_link.get(PX['xlink'] + "from")
-            physical = sm_link.get(PX['xlink'] + "to")
-            if physical in self.alto_map:
-                self.logger.debug("Found structLink from %s to physical page: %s", logical, physical)
-                pages = self.struct_links.setdefault(logical, [])
-                pages.append(physical)
+        for sm_link in XPATH_STRUCTLINK_CHILDREN(self.tree):
+            self.__add_struct_link(sm_link)
+
+    # the readers of each group of fields, by engine
+    __read_titles = _PerEngine(generateds=__read_titles_generateds, lxml=__read_titles_lxml)
+    __read_names = _PerEngine(generateds=__read_names_generateds, lxml=__read_names_lxml)
+    __read_notes = _PerEngine(generateds=__read_notes_generateds, lxml=__read_notes_lxml)
+    __read_origin = _PerEngine(generateds=__read_origin_generateds, lxml=__read_origin_lxml)
+    __read_languages = _PerEngine(generateds=__read_languages_generateds, lxml=__read_languages_lxml)
+    __read_subjects = _PerEngine(generateds=__read_subjects_generateds, lxml=__read_subjects_lxml)
+    __read_physical = _PerEngine(generateds=__read_physical_generateds, lxml=__read_physical_lxml)
+    __read_rights = _PerEngine(generateds=__read_rights_generateds, lxml=__read_rights_lxml)
+    __read_header = _PerEngine(generateds=__read_header_generateds, lxml=__read_header_lxml)
+    __read_location = _PerEngine(generateds=__read_location_generateds, lxml=__read_location_lxml)
+    __read_identifiers = _PerEngine(generateds=__read_identifiers_generateds, lxml=__read_identifiers_lxml)
+    __read_collections = _PerEngine(generateds=__read_collections_generateds, lxml=__read_collections_lxml)
+
+    # the data of the METS, each read on first access (along with the other fields of its group)
+    title = _Lazy(__read_titles)
+    sub_titles = _Lazy(__read_titles)
+    part_titles = _Lazy(__read_titles)
+    volume_titles = _Lazy(__read_titles)
+    biblevel = _Lazy(__read_titles)
+    bibtype = _Lazy(__read_titles)
+    authors = _Lazy(__read_names)
+    editors = _Lazy(__read_names)
+    notes = _Lazy(__read_notes)
+    places = _Lazy(__read_origin)
+    dates = _Lazy(__read_origin)
+    publishers = _Lazy(__read_origin)
+    edition = _Lazy(__read_origin)
+    languages = _Lazy(__read_languages)
+    scripts = _Lazy(__read_languages)
+    classifications = _Lazy(__read_subjects)
+    subjects = _Lazy(__read_subjects)
+    digital_origin = _Lazy(__read_physical)
+    extents = _Lazy(__read_physical)
+    owner_digital = _Lazy(__read_rights)
+    license = _Lazy(__read_rights)
+    license_url = _Lazy(__read_rights)
+    encoding_date = _Lazy(__read_header)
+    encoding_desc = _Lazy(__read_header)
+    shelf_locators = _Lazy(__read_location)
+    location_phys = _Lazy(__read_location)
+    location_urls = _Lazy(__read_location)
+    identifiers = _Lazy(__read_identifiers)
+    collections = _Lazy(__read_collections)
+    pages = _Lazy(__read_pages, default=PageTable)
+    struct_links = _Lazy(__read_pages, default=dict)
+    script_iso = _Lazy(default=Iso15924)
+
+    def __language_name(self, code: str) -> str:
+        """
+        Return the German name of a language code (or `Unbekannt`).
+        """
+        name = _language_name(code)
+        if name is None:
+            self.logger.error(f"unknown locale {code!r}. Falling back to 'Unbekannt'")
+            return "Unbekannt"
+        return name
 
     @property
     def fulltext_group_name(self) -> str:
@@ -685,23 +1481,34 @@ class Mets:
         """
         return self.languages
 
-    def get_page_structure(self):
+    def __struct_map_div_generateds(self, typ: str) -> Any:
         """
-        Return the div structure from the physical struct map.
+        Return the div of the first struct map of a type (or None).
         """
         for struct_map in self.mets.get_structMap():
-            if struct_map.get_TYPE() == "PHYSICAL":
+            if struct_map.get_TYPE() == typ:
                 return struct_map.get_div()
         return None
 
+    def __struct_map_div_lxml(self, typ: str) -> '_Div | None':
+        """
+        Return the div of the first struct map of a type (or None).
+        """
+        return next(map(_Div, XPATH_STRUCT_MAP_DIV(self.mets, type=typ)), None)
+
+    __struct_map_div = _PerEngine(generateds=__struct_map_div_generateds, lxml=__struct_map_div_lxml)
+
+    def get_page_structure(self):
+        """
+        Return the div structure from the physical struct map.
+        """
+        return self.__struct_map_div("PHYSICAL")
+
     def get_div_structure(self):
         """
         Return the div structure from the logical struct map.
         """
-        for struct_map in self.mets.get_structMap():
-            if struct_map.get_TYPE() == "LOGICAL":
-                return struct_map.get_div()
-        return None
+        return self.__struct_map_div("LOGICAL")
 
     def get_struct_links(self, log_id):
         """
@@ -713,22 +1520,22 @@ class Mets:
         """
         Return an image link for a given physical ID.
         """
-        return self.img_map.get(phys_id, "")
+        return self.pages.get('img', phys_id, "")
 
     def get_alto(self, phys_id):
         """
         Return the ALTO link for a given physical ID.
         """
-        return self.alto_map.get(phys_id, "")
+        return self.pages.get('alto', phys_id, "")
 
     def get_order(self, phys_id):
         """
         Return the logical (manually set) page number for a given physical ID.
         """
-        return self.order_map.get(phys_id, "0")
+        return self.pages.get('order', phys_id, "0")
 
     def get_orderlabel(self, phys_id):
         """
         Return the logical (manually set) page label for a given physical ID.
         """
-        return self.orderlabel_map.get(phys_id, "")
+        return self.pages.get('orderlabel', phys_id, "")
@@ -0,0 +1,77 @@
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+RETRY_STATUS_FORCELIST = [
+    # probably too wide (only transient failures):
+    408,  # Request Timeout
+    409,  # Conflict
+    412,  # Precondition Failed
+    417,  # Expectation Failed
+    423,  # Locked
+    424,  # Fail
+    425,  # Too Early
+    426,  # Upgrade Required
+    428,  # Precondition Required
+    429,  # Too Many Requests
+    440,  # Login Timeout
+    500,  # Internal Server Error
+    503,  # Service Unavailable
+    504,  # Gateway Timeout
+    509,  # Bandwidth Limit Exceeded
+    529,  # Site Overloaded
+    598,  # Proxy Read Timeout
+    599,  # Proxy Connect Timeout
+]
+
+
+class HttpSession(requests.Session):
+    """
+    An HTTP session for fetching ALTO files, keeping a pool of connections
+    per host open across requests (and documents), with a retry policy
+    for transient failures.
+    """
+
+    def __init__(self, pool_size: int = 10, retries: int | Retry = 3, backoff_factor: float = 0) -> None:
+        """
+        Initialize the session.
+
+        Args:
+            pool_size (int): How many connections to keep open per host
+                (and how many hosts to keep connections to).
+            retries (int | Retry): How often to retry a request (on connection
+                errors and transient HTTP errors), or a custom retry policy.
+            backoff_factor (float): How long to wait between retries
+                (doubling with each retry).
+        """
+        super().__init__()
+        self.pool_size = pool_size
+        if not isinstance(retries, Retry):
+            retries = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUS_FORCELIST)
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.mount('http://', self.adapter)
+        self.mount('https://', self.adapter)
+        # keep counting when pools of hosts are dropped
+        self._dropped = {'requests': 0, 'connections': 0}
+        self.adapter.poolmanager.pools.dispose_func = self.__dispose_pool
+
+    def __dispose_pool(self, pool) -> None:
+        self._dropped['requests'] += pool.num_requests
+        self._dropped['connections'] += pool.num_connections
+        pool.close()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Return connection reuse statistics: the number of `requests` (including
+        retries), of new `connections` opened for them, and of `reused` ones.
+        """
+        stats = dict(self._dropped)
+        pools = self.adapter.poolmanager.pools
+        # (the container of pools cannot be iterated directly)
+        for key in pools.keys():  # noqa: SIM118
+            pool = pools.get(key)
+            if pool is not None:
+                stats['requests'] += pool.num_requests
+                stats['connections'] += pool.num_connections
+        stats['reused'] = stats['requests'] - stats['connections']
+        return stats
@@ -1,20 +1,26 @@
 import copy
+import functools
 import logging
 import mimetypes
 import os
 import re
-from itertools import chain
-from urllib.parse import urlparse
+import shutil
+import tempfile
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import accumulate, chain, islice
+from urllib.parse import urljoin, urlparse
 
 import requests
 from lxml import etree
-from requests.adapters import HTTPAdapter, Retry
 
-from .alto import Alto
+from .alto import CHUNK_SIZE, Alto
+from .heading import HeadingMatcher
+from .session import HttpSession
 from .util import NS, PX, resource_filename
 
 XPATH_PB = etree.XPath("tei:pb", namespaces=NS)
-XPATH_LB = etree.XPath('//tei:lb', namespaces=NS)
 XPATH_RECURSIVE_TEXT = etree.XPath('descendant-or-self::*/text()')
 XPATH_MAINTITLE = etree.XPath('tei:title[@type="main"]', namespaces=NS)
 XPATH_SUBTITLE = etree.XPath('tei:title[@type="sub"]', namespaces=NS)
@@ -40,6 +46,32 @@ XPATH_FRONT = etree.XPath('//tei:text/tei:front', namespaces=NS)
 XPATH_BODY = etree.XPath('//tei:text/tei:body', namespaces=NS)
 XPATH_BODY_DIV = etree.XPath('//tei:text/tei:body/tei:div', namespaces=NS)
 XPATH_BACK = etree.XPath('//tei:text/tei:back', namespaces=NS)
+TEI_LB = f"{PX['tei']}lb"
+# stands in for the top-level divs of front, body and back when serializing the rest (see `_DivWriter`)
+DIVS_PLACEHOLDER = "mets_mods2tei:divs"
+# elements of the TEI skeleton which are looked up right away in every new Tei
+SKELETON_ANCHORS = (
+    XPATH_FILE,
+    XPATH_TIT,
+    XPATH_PUB,
+    XPATH_BIBL,
+    XPATH_BIBLFULL,
+    XPATH_BIBLFULL_PUB,
+    XPATH_ID,
+    XPATH_PHY,
+    XPATH_ENC,
+    XPATH_PROF,
+    XPATH_FRONT,
+    XPATH_BODY,
+    XPATH_BACK,
+)
+# elements added while filling, relative to the skeleton anchors they are added to
+RELATIVE_PATHS = {
+    XPATH_EDN: (XPATH_FILE, 'tei:editionStmt'),
+    XPATH_BIBLFULL_TIT: (XPATH_BIBLFULL, 'tei:titleStmt'),
+    XPATH_BIBLFULL_EDN: (XPATH_BIBLFULL, 'tei:editionStmt'),
+    XPATH_BODY_DIV: (XPATH_BODY, 'tei:div'),
+}
 
 # FIXME: add more structural mappings from METS-Anwendungsprofil (DFG Strukturdatenset) to TEI-P5 tagset (DTAbf)
 # ruff: disable[F601]
@@ -87,45 +119,426 @@ DIV_METS2TEI = {
 # ruff: enable[F601]
 
 
+@functools.cache
+def _skeleton(compact=False):
+    """
+    Parse the TEI skeleton (once per process) as a template for new Tei objects,
+    along with the paths (child indexes from the root) to its anchor elements.
+    If `compact`, then without its indentation (the whitespace-only text and tails).
+    """
+    with open(resource_filename('mets_mods2tei', 'data/tei_skeleton.xml')) as skeleton:
+        tree = etree.parse(skeleton)
+    root = tree.getroot()
+    if compact:
+        for node in root.iter(etree.Element):
+            if node.text is not None and node.text.isspace():
+                node.text = None
+            if node.tail is not None and node.tail.isspace():
+                node.tail = None
+    paths = {}
+    for pattern in SKELETON_ANCHORS:
+        node = pattern(tree)[0]
+        path = []
+        while node is not root:
+            parent = node.getparent()
+            path.insert(0, parent.index(node))
+            node = parent
+        paths[pattern] = path
+    return tree, paths
+
+
+@functools.cache
+def _indentation(level):
+    """
+    Return the indentation (line break and spaces) of elements at some level.
+    """
+    return "\n" + "  " * level
+
+
+def _indent(element, level=0):
+    """
+    Indent the children of an element (at `level`) like `etree.indent` with two spaces,
+    and in the same pass let each line of text end with two spaces and the indentation
+    of the next line (appending them to the tail of each `lb`).
+    """
+    child_indentation = _indentation(level + 1)
+    text = element.text
+    if not text or text.isspace():
+        element.text = text = child_indentation
+    suffix = "  " + text
+    last = len(element) - 1
+    for num, child in enumerate(element):
+        if len(child):
+            _indent(child, level + 1)
+        tail = child.tail
+        if not tail or tail.isspace():
+            tail = _indentation(level) if num == last else child_indentation
+        if child.tag == TEI_LB:
+            tail += suffix
+        child.tail = tail
+
+
+def _end_lines(element):
+    """
+    Let each line of text end with a line break (appending it to the tail of each `lb`).
+    """
+    for lb in element.iter(TEI_LB):
+        lb.tail = (lb.tail or "") + "\n"
+
+
+class _DivWriter:
+    """
+    Writes a Tei to a binary file one top-level div of front, body and back at a time.
+
+    Takes the divs out of the tree, so the rest of it (the shell) can be serialized on
+    its own, with a placeholder per text part to split it at. Each div is indented and
+    serialized as `Tei.tostring` would (or only has its lines ended, if the Tei is
+    `compact`), written between the pieces of the shell, and dropped.
+
+    If `spool` is true (because the facsimile grows along with the text), then the divs
+    are written to a temporary file first, and copied behind the header when closing.
+    """
+
+    def __init__(self, tei, output, spool=False):
+        self.tei = tei
+        self.output = output
+        self.sink = tempfile.TemporaryFile() if spool else output  # noqa: SIM115
+        self.compact = tei.compact
+        # the divs in document order, and their indentation level
+        self.divs = []
+        self.levels = []
+        self.placeholders = []
+        for part in chain(tei.xpath(XPATH_FRONT), tei.xpath(XPATH_BODY), tei.xpath(XPATH_BACK)):
+            divs = list(part)
+            if not divs:
+                continue
+            level = sum(1 for _ in part.iterancestors()) + 1
+            for div in divs:
+                part.remove(div)
+                if not self.compact:
+                    # (the tail is indented anew)
+                    div.tail = None
+            self.divs.extend(divs)
+            self.levels.extend([level] * len(divs))
+            placeholder = etree.Comment(DIVS_PLACEHOLDER)
+            part.append(placeholder)
+            self.placeholders.append((placeholder, len(self.divs)))
+        self.pieces = self.__shell()
+        if not spool:
+            self.output.write(self.pieces[0])
+        # how many divs and pieces of the shell have been written
+        self.written = 0
+        self.piece = 1
+
+    def __shell(self):
+        """
+        Serialize the tree without the divs, and split it at the placeholders
+        (before the indentation of the first div of each part).
+        """
+        placeholder = f"<!--{DIVS_PLACEHOLDER}-->".encode()
+        if self.compact:
+            return etree.tostring(self.tei.tree, encoding="utf-8").split(placeholder)
+        _indent(self.tei.tree.getroot())
+        pieces = etree.tostring(self.tei.tree, pretty_print=True, encoding="utf-8").split(placeholder)
+        return [piece.rstrip(b" ").removesuffix(b"\n") for piece in pieces[:-1]] + pieces[-1:]
+
+    def write(self, count):
+        """
+        Write the divs up to the first `count` ones (those not written yet).
+        """
+        while self.written < count:
+            if self.written == self.placeholders[self.piece - 1][1]:
+                # the end of a part
+                self.sink.write(self.pieces[self.piece])
+                self.piece += 1
+            div = self.divs[self.written]
+            level = self.levels[self.written]
+            self.divs[self.written] = None
+            self.written += 1
+            # serialize in a copy of the root element, so the namespaces are declared there only
+            root = self.tei.tree.getroot()
+            wrapper = etree.Element(root.tag, nsmap=root.nsmap)
+            if self.compact:
+                _end_lines(div)
+            else:
+                if len(div):
+                    _indent(div, level)
+                wrapper.text = _indentation(level)
+            wrapper.append(div)
+            data = etree.tostring(wrapper, pretty_print=not self.compact, encoding="utf-8")
+            self.sink.write(data[data.index(b">") + 1 : data.rindex(b"</")])
+
+    def close(self):
+        """
+        Write the remaining divs and the rest of the shell (and copy the spooled divs behind the header).
+        """
+        self.write(len(self.divs))
+        for piece in self.pieces[self.piece :]:
+            self.sink.write(piece)
+        if self.sink is not self.output:
+            self.output.write(self.__shell()[0])
+            self.sink.seek(0)
+            shutil.copyfileobj(self.sink, self.output)
+            self.sink.close()
+        for placeholder, _ in self.placeholders:
+            placeholder.getparent().remove(placeholder)
+
+
+def _load_alto(alto_link, wd, session, text_only=False):
+    """
+    Read the ALTO file behind a link, resolving relative links against the METS location `wd`,
+    and fetching remote ones via `session`.
+
+    Return None (after logging) if the link cannot be read.
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        sections = urlparse(alto_link)
+    except ValueError:
+        return None
+
+    # use urlopen for both paths and URLs
+    if not sections.scheme:
+        if urlparse(wd).scheme:
+            # METS was downloaded: relative to its URL
+            mod_link = urljoin(wd, alto_link)
+        else:
+            mod_link = 'file:' + alto_link
+    else:
+        mod_link = alto_link
+    logger.debug(mod_link)
+
+    if mod_link.startswith('file:'):
+        fpath = mod_link[5:]
+        if fpath.startswith('///'):
+            # support condensed file://localhost/path
+            fpath = fpath[3:]
+            if not fpath.startswith('/'):
+                fpath = os.path.join(wd, fpath)
+        elif fpath.startswith('//'):
+            # support non-standard file://path
+            fpath = fpath[2:]
+            fpath = os.path.join(wd, fpath)
+        elif fpath.startswith('/'):
+            # support file:/path
+            fpath = fpath[1:]
+            fpath = os.path.join(wd, fpath)
+        else:
+            fpath = os.path.join(wd, fpath)
+        try:
+            with open(fpath, 'rb') as file:
+                return Alto.fromfile(file, text_only)
+        except FileNotFoundError as e:
+            logger.error("cannot open OCR result for '%s': %s", mod_link, e)
+            return None
+    try:
+        response = session.get(mod_link, timeout=3, stream=True)
+    except requests.exceptions.RetryError as e:
+        logger.error("cannot fetch OCR result for '%s': %s", mod_link, e)
+        return None
+    # parse while downloading
+    try:
+        return Alto.fromchunks(response.iter_content(CHUNK_SIZE), text_only)
+    finally:
+        response.close()
+
+
+@functools.lru_cache(maxsize=64)
+def _guess_mime_type(suffixes):
+    """
+    Guess the MIME type of a file name by its suffixes (see `_mime_type`).
+    """
+    return mimetypes.guess_type("_" + suffixes)[0]
+
+
+def _mime_type(url):
+    """
+    Guess the MIME type of a file by its URL, like `mimetypes.guess_type`,
+    but cached by the suffixes of the file name (which the images of
+    a document mostly share).
+    """
+    name = url.rpartition('/')[2]
+    if ':' in name or url[:5].lower() == 'data:':
+        # (a scheme, or a data URL)
+        return mimetypes.guess_type(url)[0]
+    stem = name.lstrip('.')
+    dot = stem.find('.')
+    if dot < 0:
+        return None
+    return _guess_mime_type(stem[dot:])
+
+
+def _add_paragraphs(alto, node, line_refs=False):
+    """
+    Add a paragraph for each text block of an ALTO file to a node, with a line
+    break and the text of each line (referencing the line ID if `line_refs`),
+    and index the blocks and lines in the page text.
+    """
+    for text_block in alto.get_text_blocks():
+        alto.add_block(text_block)
+        p = etree.SubElement(node, f"{PX['tei']}p")
+        lines = alto.get_lines_in_text_block(text_block)
+        line_ids = alto.get_line_ids(lines) if line_refs else None
+        for num, line in enumerate(lines):
+            lb = etree.SubElement(p, TEI_LB)
+            if line_refs:
+                lb.set("n", line_ids[num])
+            line_text = alto.get_text_in_line(line)
+            if line_text:
+                lb.tail = line_text
+                # FIXME: Technically, we only need to index the lines of div-introducing pages
+                alto.add_line(lb, line_text)
+
+
+# the HTTP session of a page worker process (see `_page_fragment`)
+_page_session = None
+
+
+def _init_page_worker(pool_size, retries):
+    """
+    Set up the HTTP session of a page worker process (with the settings of the session of the caller).
+    """
+    global _page_session
+    _page_session = HttpSession(pool_size=pool_size, retries=retries)
+
+
+def _page_in_worker(alto_link, wd, line_refs=False, indexes=()):
+    """
+    Build a page in a page worker process (see `_page_fragment`).
+
+    Returns the page, along with the ID of the worker process and the
+    statistics of its HTTP session so far (see `HttpSession.stats`).
+    """
+    return _page_fragment(alto_link, wd, line_refs, indexes), os.getpid(), _page_session.stats
+
+
+def _page_fragment(alto_link, wd, line_refs=False, indexes=(), session=None):
+    """
+    Read the ALTO file behind a link and build its paragraphs (see `_add_paragraphs`),
+    e.g. in a page worker process.
+
+    Returns the paragraphs serialized as a fragment of TEI, along with the (released)
+    page holding the text and the offsets of its blocks and lines and the text
+    `indexes` (by case-sensitivity and normalization) built for heading search,
+    or None if the link cannot be read (see `_splice_fragment`).
+    """
+    alto = _load_alto(alto_link, wd, session or _page_session, text_only=True)
+    if alto is None:
+        return None
+    wrapper = etree.Element(f"{PX['tei']}TEI", nsmap={None: NS['tei']})
+    _add_paragraphs(alto, wrapper, line_refs)
+    alto.release()
+    for lower, alnum in indexes:
+        alto.text_index(lower, alnum)
+    return alto, etree.tostring(wrapper, encoding="utf-8")
+
+
+def _splice_fragment(alto, node, fragment):
+    """
+    Add the paragraphs of a fragment built by `_page_fragment` to a node,
+    and index the nodes of its lines in the page text.
+    """
+    wrapper = etree.fromstring(fragment)
+    # (only lines with text are indexed)
+    alto.line_nodes = [lb for lb in wrapper.iter(TEI_LB) if lb.tail]
+    node.extend(list(wrapper))
+
+
 class Tei:
-    def __init__(self):
+    # whether to read only the text of ALTO files (into compact records instead of full trees)
+    text_only = False
+    # whether to drop ALTO files once no div links to them any more
+    evict = False
+    # whether to serialize without indentation
+    compact = False
+
+    def __init__(self, text_only=None, matcher=None, evict=None, compact=None):
         """
         The constructor.
+
+        If `text_only` is true, then ALTO files are read only for their text blocks
+        and lines, so `alto_map` holds no ALTO trees (defaults to `Tei.text_only`).
+
+        If `evict` is true, then ALTO files are released once their text has been added,
+        and dropped from `alto_map` (leaving None) once no div links to them any more,
+        so memory does not grow with the number of pages (defaults to `Tei.evict`).
+
+        Headings of divs are located in the text of their first page via `matcher`
+        (a `HeadingMatcher`, defaults to fuzzy search only).
+
+        If `compact` is true, then the TEI is serialized without indentation, with
+        only a line break after each line of text (defaults to `Tei.compact`).
         """
+        if text_only is not None:
+            self.text_only = text_only
+        if evict is not None:
+            self.evict = evict
+        if compact is not None:
+            self.compact = compact
+        self.matcher = matcher if matcher is not None else HeadingMatcher()
 
-        with open(resource_filename('mets_mods2tei', 'data/tei_skeleton.xml')) as skeleton:
-            self.tree = etree.parse(skeleton)
+        template, paths = _skeleton(self.compact)
+        self.tree = copy.deepcopy(template)
         self.alto_map = {}
         self.refs = []
-        self._cache = {}
+        # the anchor elements of the skeleton never move, so keep them at hand
+        root = self.tree.getroot()
+        self.anchors = {pattern: functools.reduce(lambda node, i: node[i], path, root) for pattern, path in paths.items()}
 
         # logging
         self.logger = logging.getLogger(__name__)
 
     def xpath(self, pattern):
-        if pattern not in self._cache:
-            if pattern is XPATH_FACS:
-                # fill only when needed
-                facsimile = etree.Element(f"{PX['tei']}facsimile")
-                self.tree.getroot().insert(1, facsimile)
-            self._cache[pattern] = pattern(self.tree)
-            self.logger.debug("adding cache entry for %s", pattern)
-        return self._cache[pattern]
+        """
+        Return the elements matching one of the `XPATH_*` patterns.
+
+        Resolves skeleton anchors directly and elements added to them relative
+        to their anchor, so the cost does not depend on the size of the text.
+        """
+        if pattern in self.anchors:
+            return [self.anchors[pattern]]
+        if pattern in RELATIVE_PATHS:
+            anchor, path = RELATIVE_PATHS[pattern]
+            return self.anchors[anchor].findall(path, namespaces=NS)
+        if pattern is XPATH_FACS:
+            # fill only when needed
+            facsimile = etree.Element(f"{PX['tei']}facsimile")
+            self.tree.getroot().insert(1, facsimile)
+            self.anchors[XPATH_FACS] = facsimile
+            return [facsimile]
+        return pattern(self.tree)
 
     def tostring(self):
         """
-        Serializes the TEI object as xml string.
+        Serializes the TEI object as xml string (indented in a single pass, unless `compact`).
         """
-        # needs lxml>=4.5:
-        etree.indent(self.tree, space="  ")
-        for lb in self.xpath(XPATH_LB):
-            prefix = lb.getparent().text
-            lb.tail += "  " + prefix
+        if self.compact:
+            _end_lines(self.tree.getroot())
+            return etree.tostring(self.tree, encoding="utf-8")
+        _indent(self.tree.getroot())
         return etree.tostring(self.tree, pretty_print=True, encoding="utf-8")
 
-    def fill_from_mets(self, mets, ocr=True, refs=None):
+    def write(self, output):
+        """
+        Serializes the TEI object to a binary file, as `tostring` would, but one
+        top-level div of front, body and back at a time (removing it from the tree),
+        so memory does not peak at the whole document and its serialization.
+        """
+        _DivWriter(self, output).close()
+
+    def fill_from_mets(self, mets, ocr=True, refs=None, session=None, prefetch=0, output=None, processes=0):
         """
         Fill the contents of the TEI object from a METS instance
+
+        If `session` (an `HttpSession`) is given, fetch remote ALTO files
+        through it (so its connections can be reused across documents).
+        If `prefetch` is positive, fetch that many ALTO files concurrently
+        (see `add_ocr_text`).
+
+        If `output` (a binary file) is given, then also serialize the TEI object
+        to it, writing each top-level div as soon as its text is complete (see `write`).
+        If `processes` is positive, then build the pages in that many worker processes
+        (see `add_ocr_text`).
         """
 
         if refs:
@@ -267,7 +680,9 @@ class Tei:
 
         # OCR
         if ocr:
-            self.add_ocr_text(mets)
+            self.add_ocr_text(mets, session, prefetch, output, processes)
+        elif output is not None:
+            self.write(output)
 
     @property
     def main_title(self):
@@ -605,7 +1020,6 @@ class Tei:
         title_stmt = self.xpath(XPATH_TIT)[0]
         bibl = self.xpath(XPATH_BIBLFULL)[0]
         bibl.append(copy.deepcopy(title_stmt))
-        self._cache.pop(XPATH_BIBLFULL_TIT, None)
 
     def set_publication_level(self, level):
         """
@@ -654,8 +1068,6 @@ class Tei:
         for title_stmt in chain(self.xpath(XPATH_TIT),
                                 self.xpath(XPATH_BIBLFULL_TIT)):
             title_stmt.append(copy.deepcopy(author))
-        self._cache.pop(XPATH_TIT, None)
-        self._cache.pop(XPATH_BIBLFULL_TIT, None)
 
     def add_note(self, note):
         """
@@ -679,7 +1091,6 @@ class Tei:
                 pub_place.text = place[key]
             elif key == "code":
                 pub_place.set("corresp", place[key])
-        self._cache.pop(XPATH_BIBLFULL_PUB, None)
 
     def add_date(self, date):
         """
@@ -692,7 +1103,6 @@ class Tei:
             pub_date.text = date[key]
             if key != "unspecified":
                 pub_date.set("datingPoint", key)
-        self._cache.pop(XPATH_BIBLFULL_PUB, None)
 
     def add_publisher(self, publisher):
         """
@@ -703,7 +1113,6 @@ class Tei:
         name.text = publisher
         pub_stmt = self.xpath(XPATH_BIBLFULL_PUB)[0]
         pub_stmt.insert(0, publisher_node)
-        self._cache.pop(XPATH_BIBLFULL_PUB, None)
 
     def add_source_edition(self, manuscript_edition):
         """
@@ -713,7 +1122,6 @@ class Tei:
         edition_stmt = etree.SubElement(bibl_full, f"{PX['tei']}editionStmt")
         edition = etree.SubElement(edition_stmt, f"{PX['tei']}edition")
         edition.text = manuscript_edition
-        self._cache.pop(XPATH_BIBLFULL_EDN, None)
 
     def add_digital_edition(self, digital_edition):
         """
@@ -723,7 +1131,6 @@ class Tei:
         edition_stmt = etree.SubElement(file_desc, f"{PX['tei']}editionStmt")
         edition = etree.SubElement(edition_stmt, f"{PX['tei']}edition")
         edition.text = digital_edition
-        self._cache.pop(XPATH_EDN, None)
 
     def add_hoster(self, hoster):
         """
@@ -732,7 +1139,6 @@ class Tei:
         pub_stmt = self.xpath(XPATH_PUB)[0]
         publisher = etree.SubElement(pub_stmt, f"{PX['tei']}publisher")
         publisher.text = hoster
-        self._cache.pop(XPATH_PUB, None)
 
     def set_availability(self, status, licence_text, licence_url):
         """
@@ -762,7 +1168,6 @@ class Tei:
         else:
             availability.set("status", "restricted")
             licence.text = "Available under licence from the publishers."
-        self._cache.pop(XPATH_PUB, None)
 
     def add_encoding_date(self, date):
         """
@@ -773,7 +1178,6 @@ class Tei:
         encoding_date.set("type", "publication")
         if date:
             encoding_date.text = date
-        self._cache.pop(XPATH_PUB, None)
 
     def set_encoding_description(self, creator):
         """
@@ -783,7 +1187,6 @@ class Tei:
         if creator:
             encoding_desc_details = etree.SubElement(encoding_desc, f"{PX['tei']}p")
             encoding_desc_details.text = f"Encoded with the help of {creator}."
-        self._cache.pop(XPATH_ENC, None)
 
     def add_repository(self, name):
         """
@@ -792,7 +1195,6 @@ class Tei:
         ms_ident = self.xpath(XPATH_ID)[0]
         repository = etree.SubElement(ms_ident, f"{PX['tei']}repository")
         repository.text = name
-        self._cache.pop(XPATH_ID, None)
 
     def add_identifier(self, type_, value):
         """
@@ -806,7 +1208,6 @@ class Tei:
         idno = etree.SubElement(ms_ident, f"{PX['tei']}idno")
         idno.set("type", type_)
         idno.text = value
-        self._cache.pop(XPATH_ID, None)
 
     def set_type_desc(self, description):
         """
@@ -817,7 +1218,6 @@ class Tei:
         for line in description.split('\n'):
             par = etree.SubElement(type_desc, f"{PX['tei']}p")
             par.text = line
-        self._cache.pop(XPATH_PHY, None)
 
     def add_classcode(self, scheme, code):
         """
@@ -829,7 +1229,6 @@ class Tei:
         classcode = etree.SubElement(textclass, f"{PX['tei']}classCode")
         classcode.set("scheme", scheme)
         classcode.text = code
-        self._cache.pop(XPATH_PROF, None)
 
     def add_keywords(self, scheme, terms):
         """
@@ -845,7 +1244,6 @@ class Tei:
             node.text = term
             if type_:
                 node.set("type", type_)
-        self._cache.pop(XPATH_PROF, None)
 
     def add_language(self, language):
         """
@@ -858,7 +1256,6 @@ class Tei:
         lang = etree.SubElement(lang_usage, f"{PX['tei']}language")
         lang.set("ident", language[0])
         lang.text = language[1]
-        self._cache.pop(XPATH_PROF, None)
 
     def add_extent(self, extent):
         """
@@ -871,7 +1268,6 @@ class Tei:
             support_desc = etree.SubElement(obj_desc, f"{PX['tei']}supportDesc")
         extent_elem = etree.SubElement(support_desc, f"{PX['tei']}extent")
         extent_elem.text = extent
-        self._cache.pop(XPATH_PHY, None)
 
     def add_collection(self, collection):
         """
@@ -880,7 +1276,6 @@ class Tei:
         ident = self.xpath(XPATH_ID)[0]
         coll = etree.SubElement(ident, f"{PX['tei']}collection")
         coll.text = collection
-        self._cache.pop(XPATH_ID, None)
 
     def compile_bibl(self, type_):
         """
@@ -904,136 +1299,187 @@ class Tei:
             bibl_text += " " + self.dates[0] + "."
         self.bibl.text = bibl_text
 
-    def add_ocr_text(self, mets):
+    def add_ocr_text(self, mets, session=None, prefetch=0, output=None, processes=0):
         """
         Add OCR text from FULLTEXT file group to the single divs
-        """
+
+        Remote ALTO files are fetched via `session` (an `HttpSession`),
+        or else via a new session for this call only.
+
+        If `prefetch` is positive, then fetch and parse the ALTO files of all divs
+        ahead of adding their text, `prefetch` of them concurrently (and at most
+        twice as many ahead).
+
+        If `output` (a binary file) is given, then serialize the TEI object to it
+        along the way (see `write`): each top-level div is written (and removed
+        from the tree) once no later div visits its pages, which could still move
+        its lines. (With `page` refs, the divs are collected in a temporary file,
+        as the facsimile before them is only complete at the end.)
+
+        If `processes` is positive, then read the ALTO files of all divs ahead in
+        that many worker processes instead (and at most twice as many ahead),
+        fetching remote ones via sessions of their own (with the pool size and
+        retry policy of `session`, and counted in its statistics logged at the
+        end). The workers also build the paragraphs and lines of each page and
+        the text index for heading search, which are then spliced into the divs
+        here in the same order, with the same result. (`alto_map` then holds
+        released ALTO files only.)
+        """
+        if session is None:
+            with HttpSession(pool_size=max(prefetch, 10)) as own_session:
+                self.add_ocr_text(mets, own_session, prefetch, output, processes)
+            return
+
         # the text-holding elements
         front = self.xpath(XPATH_FRONT)
         body = self.xpath(XPATH_BODY)
         back = self.xpath(XPATH_BACK)
-
-        if len(front):
-            for node in front[0].iterchildren():
-                self.__add_ocr_to_node(node, mets)
-            self._cache.pop(XPATH_FRONT, None)
         assert len(body)
-        for node in body[0].iterchildren():
-            self.__add_ocr_to_node(node, mets)
-        self._cache.pop(XPATH_BODY, None)
-        if len(back):
-            for node in back[0].iterchildren():
-                self.__add_ocr_to_node(node, mets)
-            self._cache.pop(XPATH_BACK, None)
+        writer = _DivWriter(self, output, spool='page' in self.refs) if output is not None else None
+        # (the writer drops the divs once written, which are always ones already visited)
+        nodes = writer.divs if writer else [node for parent in front + body + back for node in parent.iterchildren()]
+        labels = self.__page_labels(nodes, mets)
+        node_links = [list(self.__alto_links(node, mets)) for node in nodes]
+        alto_links = list(chain.from_iterable(node_links))
+        # how often each ALTO file is still going to be visited
+        uses = Counter(alto_links) if self.evict else None
+        if writer:
+            # after which node each div is complete (the last one visiting any of its pages, but in order)
+            last = {alto_link: num for num, links in enumerate(node_links) for alto_link in links}
+            complete = list(accumulate((max((last[link] for link in links), default=num)
+                                        for num, links in enumerate(node_links)), max))
+
+        load = fetch = functools.partial(self.__load_page, mets=mets, session=session)
+        result = Future.result
+        workers = processes or prefetch
+        # the HTTP session statistics of each page worker process (as of its last page received)
+        worker_stats = {}
+        if processes > 0:
+            settings = (getattr(session, 'pool_size', 1), session.get_adapter('https://').max_retries)
+            executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_page_worker, initargs=settings)
+            line_refs = 'line' in self.refs
+            fetch = functools.partial(_page_fragment, wd=mets.wd, line_refs=line_refs, session=session)
+
+            def submit(alto_link):
+                # (with the text indexes for heading search on pages where divs start)
+                indexes = self.matcher.indexes if alto_link in labels else ()
+                return executor.submit(_page_in_worker, alto_link, mets.wd, line_refs, indexes)
+
+            def result(future):
+                page, pid, stats = future.result()
+                worker_stats[pid] = stats
+                return page
+        elif prefetch > 0:
+            executor = ThreadPoolExecutor(max_workers=prefetch)
+            submit = functools.partial(executor.submit, fetch)
+        else:
+            executor = None
+        try:
+            if executor is not None:
+                # in the order of first visits
+                pending = [alto_link for alto_link in dict.fromkeys(alto_links) if alto_link not in self.alto_map]
+                self.logger.debug("Prefetching %d ALTO files", len(pending))
+                pending = iter(pending)
+                futures = {}
+
+                def load(alto_link):
+                    for next_link in islice(pending, 2 * workers - len(futures)):
+                        futures[next_link] = submit(next_link)
+                    future = futures.pop(alto_link, None)
+                    return fetch(alto_link) if future is None else result(future)
+
+            for num, node in enumerate(nodes):
+                self.__add_ocr_to_node(node, mets, load, labels, uses)
+                if writer:
+                    writer.write(bisect_right(complete, num))
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        if writer:
+            writer.close()
+        if isinstance(session, HttpSession):
+            stats = Counter(session.stats)
+            for page_stats in worker_stats.values():
+                stats.update(page_stats)
+            self.logger.debug("HTTP session statistics: %s", dict(stats))
+        self.logger.debug("Heading matches by tier: %s", self.matcher.stats)
 
-    def __add_ocr_to_node(self, node, mets):
+    def __struct_links(self, node, mets):
         """
-        Add text to a given node and recursively add text to children too (post order!).
+        Return the physical pages linked to a given node (or the node itself if it is one).
         """
-
         node_id = node.get("id")
-        self.logger.debug("Adding text for %s", node_id)
-        for childnode in node.iterchildren():
-            self.__add_ocr_to_node(childnode, mets)
         struct_links = mets.get_struct_links(node_id)
         if not struct_links and node_id in mets.page_map:
             # already physical
             struct_links = [node_id]
+        return struct_links
+
+    def __alto_links(self, node, mets):
+        """
+        Yield the ALTO links of a given node and its children (in the order `__add_ocr_to_node` needs them).
+        """
+        for childnode in node.iterchildren():
+            yield from self.__alto_links(childnode, mets)
+        for struct_link in self.__struct_links(node, mets):
+            yield mets.get_alto(struct_link)
+
+    def __page_labels(self, nodes, mets):
+        """
+        Return the labels of the given nodes and their descendants by the ALTO link of their first page.
+        """
+        labels = {}
+        for node in chain.from_iterable(node.iter() for node in nodes):
+            label = node.get("rend", default="")
+            struct_links = self.__struct_links(node, mets)
+            if struct_links and len(label) and label != "Text":
+                labels.setdefault(mets.get_alto(struct_links[0]), []).append(label)
+        return labels
+
+    def __add_ocr_to_node(self, node, mets, load, labels, uses=None):
+        """
+        Add text to a given node and recursively add text to children too (post order!).
+
+        Reads the ALTO files via `load` (along with their paragraphs, if already
+        built by a page worker), and searches the `labels` of all nodes
+        starting on a page (by ALTO link) at once. Counts down the remaining `uses`
+        of each ALTO file (if given), releasing and evicting it in time.
+        """
+
+        node_id = node.get("id")
+        self.logger.debug("Adding text for %s", node_id)
+        for childnode in node.iterchildren():
+            self.__add_ocr_to_node(childnode, mets, load, labels, uses)
+        struct_links = self.__struct_links(node, mets)
 
         # a header will always be on the first page of a div
         first = True
+        # the number of page beginnings in the node (counted once needed)
+        pbs = None
 
-        retries = Retry(
-            total=3,
-            status_forcelist=[
-                # probably too wide (only transient failures):
-                408,  # Request Timeout
-                409,  # Conflict
-                412,  # Precondition Failed
-                417,  # Expectation Failed
-                423,  # Locked
-                424,  # Fail
-                425,  # Too Early
-                426,  # Upgrade Required
-                428,  # Precondition Required
-                429,  # Too Many Requests
-                440,  # Login Timeout
-                500,  # Internal Server Error
-                503,  # Service Unavailable
-                504,  # Gateway Timeout
-                509,  # Bandwidth Limit Exceeded
-                529,  # Site Overloaded
-                598,  # Proxy Read Timeout
-                599,  # Proxy Connect Timeout
-            ],
-        )
-        adapter = HTTPAdapter(max_retries=retries)
-        session = requests.Session()
-        session.mount('http://', adapter)
-        session.mount('https://', adapter)
-        try:
-            self.__add_ocr_to_node_with_session(node, mets, struct_links, first, session)
-        finally:
-            session.close()
-
-    def __add_ocr_to_node_with_session(self, node, mets, struct_links, first, session):
         # iterate over all struct links for a div
         for struct_link in struct_links:
             alto_link = mets.get_alto(struct_link)
             # only collect ocr from a file once!
             if alto_link not in self.alto_map:
-                try:
-                    sections = urlparse(alto_link)
-                except ValueError:
+                page = load(alto_link)
+                if page is None:
                     continue
-
-                # use urlopen for both paths and URLs
-                if not sections.scheme:
-                    mod_link = 'file:' + alto_link
-                else:
-                    mod_link = alto_link
-                self.logger.debug(mod_link)
-
-                if mod_link.startswith('file:'):
-                    fpath = mod_link[5:]
-                    if fpath.startswith('///'):
-                        # support condensed file://localhost/path
-                        fpath = fpath[3:]
-                        if not fpath.startswith('/'):
-                            fpath = os.path.join(mets.wd, fpath)
-                    elif fpath.startswith('//'):
-                        # support non-standard file://path
-                        fpath = fpath[2:]
-                        fpath = os.path.join(mets.wd, fpath)
-                    elif fpath.startswith('/'):
-                        # support file:/path
-                        fpath = fpath[1:]
-                        fpath = os.path.join(mets.wd, fpath)
-                    else:
-                        fpath = os.path.join(mets.wd, fpath)
-                    try:
-                        with open(fpath, 'rb') as file:
-                            alto = Alto.fromfile(file)
-                    except FileNotFoundError as e:
-                        self.logger.error("cannot open OCR result for '%s': %s", mod_link, e)
-                        continue
-                else:
-                    try:
-                        response = session.get(mod_link, timeout=3, stream=True)
-                    except requests.exceptions.RetryError as e:
-                        self.logger.error("cannot fetch OCR result for '%s': %s", mod_link, e)
-                        continue
-                    alto = Alto.frombytes(response.content)
+                alto, fragment = page
 
                 # save original link!
                 self.alto_map[alto_link] = alto
 
                 pb = etree.SubElement(node, f"{PX['tei']}pb")
+                if pbs is not None:
+                    pbs += 1
                 if struct_link in mets.page_index_map:
                     pagenum = mets.page_index_map[struct_link]
                 else:
                     self.logger.warning("cannot determine image number for link '%s'", struct_link)
-                    pagenum = len(XPATH_PB(node))
+                    if pbs is None:
+                        pbs = len(XPATH_PB(node))
+                    pagenum = pbs
                 pageid = f"f{pagenum + 1:04d}"
                 pb.set("facs", "#" + pageid)
                 orderlabel = mets.get_orderlabel(struct_link) or mets.get_order(struct_link)
@@ -1048,37 +1494,32 @@ class Tei:
                         # facsimile.set("base", ...common url_prefix...)
                         # todo: DTABf seems to use "graphic" directly, but other dialects wrap them inside a "surface"
                         graphic = etree.SubElement(facsimile, f"{PX['tei']}graphic")
-                        mime, _enc = mimetypes.guess_type(img_url)
+                        mime = _mime_type(img_url)
                         if mime is not None:
                             graphic.set("mimeType", mime)
                         graphic.set("url", img_url)
                         graphic.set("id", pageid)
-                for text_block in alto.get_text_blocks():
-                    p = etree.SubElement(node, f"{PX['tei']}p")
-                    for line in alto.get_lines_in_text_block(text_block):
-                        lb = etree.SubElement(p, f"{PX['tei']}lb")
-                        if 'line' in self.refs:
-                            line_id = line.get("ID")
-                            if not line_id:
-                                block = line.getparent()
-                                line_id = f"{block.get('ID')}_{block.index(line):04d}"
-                            lb.set("n", line_id)
-                        line_text = alto.get_text_in_line(line)
-                        if line_text:
-                            lb.tail = line_text
-                            # FIXME: Technically, we only need to index the lines of div-introducing pages
-                            alto.text += line_text
-                            for i in range(len(line_text)):
-                                alto.line_index_struct[alto.line_index] = lb
-                                alto.line_index += 1
+                if fragment is None:
+                    _add_paragraphs(alto, node, 'line' in self.refs)
+                else:
+                    # built by a page worker
+                    _splice_fragment(alto, node, fragment)
+                if uses is not None:
+                    alto.release()
             else:
                 alto = self.alto_map[alto_link]
             # find the most likely position of the label on the page
             if first:
                 self.logger.debug("Search for '{}' on page '{}'".format(node.get("rend", default=""), str(alto_link)))
                 label = node.get("rend", default="")
+                found = None
                 if len(label) and alto.text and label != "Text":
-                    begin, length = alto.get_best_insert_index(label, True)
+                    page_labels = labels.pop(alto_link, None)
+                    if page_labels:
+                        self.matcher.prepare(alto, page_labels)
+                    found = self.matcher.match(alto, label)
+                if found is not None:
+                    begin, length = found
                     pars, lines = alto.collect_text_nodes(begin, length)
 
                     # par → head
@@ -1107,7 +1548,21 @@ class Tei:
                         self.logger.debug("Replace head for div {} ({})".format(node.get("id"), node.get("rend")))
                         for par in reversed(pars[0].getparent()[pars[0].getparent().index(pars[0]) :]):
                             node.insert(0, par)
+                        # (which may have moved page beginnings, too)
+                        pbs = None
             first = False
+            if uses is not None:
+                uses[alto_link] -= 1
+                if not uses[alto_link]:
+                    # (keeping the link, so the file is not read again)
+                    self.alto_map[alto_link] = None
+
+    def __load_page(self, alto_link, mets, session):
+        """
+        Read the ALTO file behind a link (see `_load_alto`), as a page without a prebuilt fragment.
+        """
+        alto = _load_alto(alto_link, mets.wd, session, self.text_only)
+        return None if alto is None else (alto, None)
 
     def add_div_structure(self, div):
         """
@@ -1194,9 +1649,6 @@ class Tei:
                 ]:
                     entry_point = back
                 self.__add_div(entry_point, sub_div, 1, divtype=divtype)
-        self._cache.pop(XPATH_FRONT, None)
-        self._cache.pop(XPATH_BODY, None)
-        self._cache.pop(XPATH_BACK, None)
 
     def add_physical_pages(self, pages):
         """
@@ -1209,7 +1661,6 @@ class Tei:
         for page in pages:
             self.logger.debug("Found physical page %s", page.get_ID())
             self.__add_div(body, page, 1)
-        self._cache.pop(XPATH_BODY, None)
 
     def __add_div(self, insert_node, div, n, tag="div", divtype=""):
         """
@@ -1,24 +1,231 @@
+import contextlib
 import logging
 import os
+import stat
 import sys
-from urllib.error import URLError
-from urllib.request import urlopen
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
 
 import click
 
-from mets_mods2tei import Mets, Tei
+from mets_mods2tei import HeadingMatcher, HttpSession, LayoutHints, convert
+from mets_mods2tei.api.heading import TIERS
+
+# the HTTP session of a batch worker process, reused across its documents
+_session = None
+# the heading matcher of a batch worker process, counting across its documents
+_matcher = None
+# the umask of the process for the permissions of new output files, read once
+# (as reading it means setting it, for all threads)
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+def _heading_matcher(heading_tiers, heading_distance, heading_layout):
+    """
+    Create the heading matcher for the given options.
+    """
+    layout = LayoutHints(top=heading_layout) if heading_layout else None
+    return HeadingMatcher(heading_tiers or ('fuzzy',), heading_distance, layout=layout)
+
+
+def _init_worker(log_level, prefetch, *heading_options):
+    """
+    Set up logging, the HTTP session and the heading matcher in a batch worker process.
+    """
+    global _session, _matcher
+    logging.basicConfig(level=logging.getLevelName(log_level), stream=sys.stderr)
+    _session = HttpSession(pool_size=max(prefetch, 10))
+    _matcher = _heading_matcher(*heading_options)
+
+
+@contextlib.contextmanager
+def _replacing(path):
+    """
+    Open a temporary file next to `path` for writing, which replaces `path`
+    once written (and is removed on failure), so no partial output is left.
+    The file keeps the permissions of `path`, if it exists.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            yield file
+        # (with the permissions of the file replaced or of a new one, not those of a temporary one)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_umask
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+def _convert_in_worker(mets, output, *args):
+    """
+    Convert a single METS file or URL to a TEI file in a batch worker process
+    (see `_convert_to_file`), with the HTTP session and heading matcher of the worker.
+    """
+    return _convert_to_file(mets, output, *args, session=_session, matcher=_matcher)
+
+
+def _convert_to_file(
+    mets, output, ocr, text_group, img_group, add_refs, prefetch, compact, page_jobs, session=None, matcher=None
+):
+    """
+    Convert a single METS file or URL to a TEI file in a batch,
+    streaming it to a temporary file, which replaces the TEI file on success.
+
+    Returns the METS, the output path, an error message (or None on success)
+    and how many headings each tier of the matcher found in this METS.
+    """
+    before = Counter(matcher.stats) if matcher else Counter()
+    try:
+        with _replacing(output) as output_file:
+            convert(
+                mets,
+                ocr,
+                refs=add_refs,
+                text_group=text_group,
+                img_group=img_group,
+                session=session,
+                prefetch=prefetch,
+                matcher=matcher,
+                output=output_file,
+                compact=compact,
+                processes=page_jobs,
+            )
+    except Exception as err:
+        logging.getLogger(__name__).exception("failed to convert '%s'", mets)
+        error = f"{type(err).__name__}: {err}"
+    else:
+        error = None
+    stats = Counter(matcher.stats) if matcher else Counter()
+    stats.subtract(before)
+    return mets, output, error, stats
+
+
+def _read_batch(batch):
+    """
+    Read METS files/URLs (and optional output file names) from a batch manifest.
+
+    Each non-empty line that does not start with `#` names one METS,
+    optionally followed by a tab and the output file name to use.
+    """
+    entries = []
+    for line in batch:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        mets, _, output = line.partition('\t')
+        entries.append((mets.strip(), output.strip() or None))
+    return entries
+
+
+def _batch_outputs(entries, output_dir):
+    """
+    Resolve the output paths of batch entries.
+
+    Output files default to the METS file name with a `.tei.xml` suffix.
+    Names that collide (whether generated or given in the manifest) are
+    numbered, so no two conversions write the same file.
+    """
+    jobs = []
+    seen = set()
+    for num, (mets, output) in enumerate(entries):
+        if output and output.endswith(".tei.xml"):
+            stem, suffix = output[: -len(".tei.xml")], ".tei.xml"
+        elif output:
+            stem, suffix = os.path.splitext(output)
+        else:
+            stem, suffix = Path(urlparse(mets).path).stem or "tei", ".tei.xml"
+        path = os.path.normpath(os.path.join(output_dir, stem + suffix))
+        index = num
+        while path in seen:
+            path = os.path.normpath(os.path.join(output_dir, f"{stem}_{index:04d}{suffix}"))
+            index += 1
+        if output and path != os.path.normpath(os.path.join(output_dir, output)):
+            logging.getLogger(__name__).warning("output file '%s' of '%s' is taken, using '%s'", output, mets, path)
+        seen.add(path)
+        jobs.append((mets, path))
+    return jobs
+
+
+def _report(mets, output, error):
+    """
+    Report the result of a single batch conversion on stderr.
+
+    Returns 1 on failure and 0 on success.
+    """
+    if error:
+        click.echo(f"FAILED {mets}: {error}", err=True)
+        return 1
+    click.echo(f"OK {mets} -> {output}", err=True)
+    return 0
+
+
+def _report_all(results):
+    """
+    Report the results of batch conversions (see `_convert_to_file`) as they come.
+
+    Returns the number of failures and how many headings each tier found in all METS.
+    """
+    failures = 0
+    stats = dict.fromkeys((*TIERS, 'none'), 0)
+    for mets, output, error, document_stats in results:
+        failures += _report(mets, output, error)
+        for tier, count in document_stats.items():
+            stats[tier] += count
+    return failures, stats
 
 
 @click.command(context_settings={'help_option_names': ['-h', '--help']})
-@click.argument('mets', required=True)
-@click.option('-O', '--output', default="-", type=click.File("wb", lazy=False), help="File path to write TEI output to")
+@click.argument('mets', nargs=-1)
+@click.option('-O', '--output', default="-", type=click.Path(dir_okay=False, allow_dash=True),
+              help="File path to write TEI output to")
+@click.option('-B', '--batch', type=click.File("r"), help="File listing METS files/URLs to convert, one per line")
+@click.option('-D', '--output-dir', type=click.Path(file_okay=False), help="Directory for TEI files (batch mode)")
+@click.option('-j', '--jobs', default=1, type=click.IntRange(min=1), help="Number of worker processes in batch mode")
 @click.option('-o', '--ocr', is_flag=True, default=False, help="Serialize OCR into resulting TEI")
 @click.option('-T', '--text-group', default="FULLTEXT", help="File group which contains the full-text")
 @click.option('-I', '--img-group', default="DEFAULT", help="File group which contains the images")
 @click.option('-r', '--add-refs', type=click.Choice(['page', 'line']), multiple=True)
+@click.option('-P', '--prefetch', default=0, type=click.IntRange(min=0), help="Number of ALTO files to fetch concurrently")
+@click.option('-J', '--page-jobs', default=0, type=click.IntRange(min=0),
+              help="Number of worker processes to read ALTO files and build pages in")
+@click.option('-H', '--heading-tier', 'heading_tiers', type=click.Choice(TIERS), multiple=True,
+              help="Tiers of heading matching to try in order (default: fuzzy)")
+@click.option('--heading-distance', default=1.0, type=click.FloatRange(0, 1),
+              help="Largest distance of fuzzy heading matches, relative to the label length")
+@click.option('-L', '--heading-layout', default=0, type=click.IntRange(min=0),
+              help="Number of topmost text blocks to search headings in first (with large-font and short blocks)")
+@click.option('-C', '--compact', is_flag=True, default=False, help="Write TEI without indentation")
 @click.option('-l', '--log-level', type=click.Choice(['DEBUG', 'INFO', 'WARN', 'ERROR', 'OFF']), default='WARN')
-def cli(mets, output, ocr, text_group, img_group, add_refs, log_level):
-    """METS: File containing or URL pointing to the METS/MODS XML to be converted
+def cli(
+    mets,
+    output,
+    batch,
+    output_dir,
+    jobs,
+    ocr,
+    text_group,
+    img_group,
+    add_refs,
+    prefetch,
+    page_jobs,
+    heading_tiers,
+    heading_distance,
+    heading_layout,
+    compact,
+    log_level,
+):
+    """METS: File(s) containing or URL(s) pointing to the METS/MODS XML to be converted
 
     Parse given METS and its meta-data, and convert it to TEI.
 
@@ -32,37 +239,94 @@ def cli(mets, output, ocr, text_group, img_group, add_refs, log_level):
     if `--add-refs` contains `line`, then reference the corresponding
     text line segments (by XML ID) from `--text-group`.
 
+    If `--prefetch` is positive, then fetch and parse that many
+    ALTO files concurrently before converting their contents.
+    If `--page-jobs` is positive, then read the ALTO files and
+    convert their contents in that many worker processes instead
+    (for single large documents on several cores).
+
+    Locate the headings of structures on their first page by trying
+    the tiers in `--heading-tier` in order: `exact` substrings, then
+    substrings `normalized` to alphanumeric characters, then `fuzzy`
+    matches within `--heading-distance`. (Headings are not placed
+    if no tier matches.) Log how many headings each tier matched.
+
+    If `--heading-layout` is positive, then search headings in that many
+    topmost text blocks, in blocks with a larger font and in short blocks
+    first (accepting only close matches), and only then in the full page.
+
     Output XML to `--output (use '-' for stdout), log to stderr.`
+    Write each top-level structure as soon as its text is complete
+    (or, with `--add-refs page`, all of them once all pages are read).
+    Files are written under a temporary name and only replace `--output`
+    once the conversion succeeded. (On stdout, a failed conversion leaves
+    truncated XML behind, so check the exit status.)
+    If `--compact` is given, then do not indent the XML (but still
+    end each line of text with a line break).
+
+    If several METS are given, or `--batch` names a file listing them
+    (one per line, optionally followed by a tab and the output file name),
+    then convert all of them in batch mode, writing one TEI file per METS
+    into `--output-dir`, using `--jobs` worker processes. Report success
+    or failure per METS on stderr.
     """
 
     #
     # logging level
     logging.basicConfig(level=logging.getLevelName(log_level), stream=sys.stderr)
 
-    #
-    # interpret mets argument
-    try:
-        f = urlopen(mets)
-    except (ValueError, URLError):
-        f = open(mets, "rb")  # noqa: SIM115
-        # physical file: enter METS directory for relative FLocat refs
-        os.chdir(os.path.normpath(os.path.dirname(mets)))
+    entries = [(path, None) for path in mets]
+    if batch:
+        entries.extend(_read_batch(batch))
+    if not entries:
+        raise click.UsageError("Missing argument 'METS' (or option '--batch').")
 
-    #
-    # read in METS
-    mets = Mets()
-    mets.fulltext_group_name = text_group
-    mets.image_group_name = img_group
-    with f as mets_file:
-        mets.fromfile(mets_file)
+    if not batch and len(entries) == 1:
+        matcher = _heading_matcher(heading_tiers, heading_distance, heading_layout)
+        if output == "-":
+            target = click.open_file(output, "wb")
+        else:
+            target = _replacing(output)
+        with target as output_file:
+            convert(
+                mets[0],
+                ocr,
+                refs=add_refs,
+                text_group=text_group,
+                img_group=img_group,
+                prefetch=prefetch,
+                matcher=matcher,
+                output=output_file,
+                compact=compact,
+                processes=page_jobs,
+            )
+        logging.getLogger(__name__).info("heading matches by tier: %s", matcher.stats)
+        return
 
     #
-    # create TEI (from skeleton)
-    tei = Tei()
-
-    tei.fill_from_mets(mets, ocr, refs=add_refs)
-
-    output.write(tei.tostring())
+    # batch mode
+    if not output_dir:
+        raise click.UsageError("Option '--output-dir' is required in batch mode.")
+    os.makedirs(output_dir, exist_ok=True)
+    output_dir = os.path.abspath(output_dir)
+    batch_jobs = _batch_outputs(entries, output_dir)
+    args = (ocr, text_group, img_group, add_refs, prefetch, compact, page_jobs)
+    if jobs == 1:
+        matcher = _heading_matcher(heading_tiers, heading_distance, heading_layout)
+        with HttpSession(pool_size=max(prefetch, 10)) as session:
+            failures, stats = _report_all(
+                _convert_to_file(path, output_path, *args, session=session, matcher=matcher)
+                for path, output_path in batch_jobs
+            )
+    else:
+        initargs = (log_level, prefetch, heading_tiers, heading_distance, heading_layout)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+            futures = [executor.submit(_convert_in_worker, path, output_path, *args) for path, output_path in batch_jobs]
+            failures, stats = _report_all(future.result() for future in futures)
+    logging.getLogger(__name__).info("heading matches by tier: %s", stats)
+    click.echo(f"converted {len(batch_jobs) - failures} of {len(batch_jobs)} METS", err=True)
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -145,6 +145,89 @@ def test_best_insert_index_edge_cases():
     alto.text = "Some prefix Hello World suffix"
     assert alto.get_best_insert_index("Hello") == (12, 5)
 
+def test_text_index():
+    """
+    Test the fuzzy search on the normalized text: exact matches win first,
+    otherwise the last window with minimal distance.
+    """
+    from mets_mods2tei.api.alto import TextIndex
+
+    index = TextIndex("I. Kap. Vorrede. Kap. II")
+    assert index.text == "IKapVorredeKapII"
+    assert list(index.offsets[:5]) == [0, 1, 1, 1, 2]
+    assert index.find("Kap") == 3
+    assert index.find("Kap", 4) == 17
+    assert index.find("Vorrede") == 8
+    assert index.find("Varrede") == 8
+    assert index.find("Kxp") == 17
+    assert index.find("Kap", 30) == -1
+    alto = Alto()
+    alto.text = "abc Vorrede xyz"
+    assert alto.get_best_insert_index("VORREDE", lower=True) == (4, 7)
+    alto.text = "VORREDE abc"
+    assert alto.get_best_insert_index("VORREDE", lower=True) == (0, 7)
+
+def test_best_insert_indexes():
+    """
+    Test finding several labels on a page at once.
+    """
+    labels = ["Vorrede", "Kap. I", "Kap. II", "Vorrede", "Inhalt", "Anhang und Register"]
+    alto = Alto()
+    alto.text = "Vorrede. Text. Kap. I. Text. Kap. II. Text. Anhang. Text."
+    single = [alto.get_best_insert_index(label, lower=True) for label in labels]
+    alto = Alto()
+    alto.text = "Vorrede. Text. Kap. I. Text. Kap. II. Text. Anhang. Text."
+    assert alto.get_best_insert_indexes(labels, lower=True) == single
+    assert single[:3] == [(0, 7), (15, 6), (29, 7)]
+    assert ("kap. ii", True, 0) in alto.matches
+    alto.text = "Kap. II"
+    assert not alto.matches
+
+def test_best_insert_indexes_page(datadir):
+    """
+    Test finding labels of different lengths on a page at once, like separately
+    and like scoring all windows.
+    """
+    from rapidfuzz.distance import Levenshtein
+
+    def scan(text, label, start):
+        # the first exact window, or else the last window with minimal distance
+        normalize = str.maketrans('', '', '. ')
+        windows = [text[begin : begin + len(label)].translate(normalize) for begin in range(start, len(text) - len(label))]
+        label = label.translate(normalize)
+        if label in windows:
+            return start + windows.index(label)
+        distances = [Levenshtein.distance(label, window) for window in windows]
+        return start + len(distances) - 1 - distances[::-1].index(min(distances))
+
+    source = Alto.read(str(datadir.join('test_alto.xml')))
+    text = " ".join(
+        source.get_text_in_line(line)
+        for block in source.get_text_blocks()
+        for line in source.get_lines_in_text_block(block)
+    )
+    labels = [
+        "Vorbericht",
+        "Missionen der Evangclischen Brüdcr",
+        "Indianer",
+        "Völker",
+        "Beynahe von ihrem Anfange an hat die Misslon viele Gegner",
+        "Register der Sachen und Personen",
+        "xyz",
+        "Vorbericht",
+    ]
+    for start in (0, 100):
+        alto = Alto()
+        alto.text = text
+        alto.insert_index = start
+        separate = [alto.get_best_insert_index(label) for label in labels]
+        alto = Alto()
+        alto.text = text
+        alto.insert_index = start
+        assert alto.get_best_insert_indexes(labels) == separate
+        for label, (begin, _) in zip(labels, separate):
+            assert begin == scan(text, label, start)
+
 def test_read_non_existent():
     """
     Test Alto.read with non-existent path returns None.
@@ -186,12 +269,11 @@ def test_collect_text_nodes():
     lines_b1 = alto.get_lines_in_text_block(blocks[0])
     lines_b2 = alto.get_lines_in_text_block(blocks[1])
 
-    alto.line_index_struct = {
-        0: lines_b1[0],
-        1: lines_b1[0],
-        2: lines_b1[1],
-        3: lines_b2[0]
-    }
+    alto.add_line(lines_b1[0], "ab")
+    alto.add_line(lines_b1[1], "c")
+    alto.add_line(lines_b2[0], "d")
+    assert alto.text == "abcd"
+    assert list(alto.line_starts) == [0, 2, 3]
 
     pars, lines = alto.collect_text_nodes(0, 4)
     assert len(pars) == 1
@@ -216,9 +298,97 @@ def test_collect_text_nodes():
     blocks2 = alto2.get_text_blocks()
     lines_b1_2 = alto2.get_lines_in_text_block(blocks2[0])
     lines_b2_2 = alto2.get_lines_in_text_block(blocks2[1])
-    alto2.line_index_struct = {
-        0: lines_b1_2[0],
-        1: lines_b2_2[0],
-    }
+    alto2.add_line(lines_b1_2[0], "a")
+    alto2.add_line(lines_b2_2[0], "b")
     pars2, lines2 = alto2.collect_text_nodes(0, 2)
     assert len(pars2) == 1
+
+def test_collect_text_nodes_offsets():
+    """
+    Test collect_text_nodes with matches starting and ending within lines.
+    """
+    from lxml import etree
+
+    par = etree.Element("p")
+    nodes = [etree.SubElement(par, "lb") for _ in range(4)]
+    alto = Alto()
+    for node, text in zip(nodes, ["Hello ", "World", "!", "Bye"]):
+        alto.add_line(node, text)
+    assert alto.text == "Hello World!Bye"
+    assert alto.collect_text_nodes(4, 1) == ([par], nodes[:1])
+    assert alto.collect_text_nodes(4, 3) == ([par], nodes[:2])
+    assert alto.collect_text_nodes(6, 6) == ([par], nodes[1:3])
+    assert alto.collect_text_nodes(11, 4) == ([par], nodes[2:])
+    assert alto.collect_text_nodes(-1, 0) == ([], [])
+
+def test_fromchunks(datadir):
+    """
+    Test parsing ALTO incrementally.
+    """
+    from lxml import etree
+
+    def elements(alto):
+        return [(elem.tag, dict(elem.attrib)) for elem in alto.tree.iter()]
+
+    content = Path(datadir.join('test_alto.xml')).read_bytes()
+    expected = Alto.frombytes(content)
+    assert expected.tree.tag == "{http://www.loc.gov/standards/alto/ns-v2#}alto"
+    for size in (1, 7, 10, 11, 4096):
+        chunks = (content[i:i + size] for i in range(0, len(content), size))
+        alto = Alto.fromchunks(chunks)
+        assert elements(alto) == elements(expected)
+        assert [alto.get_text_in_line(line) for line in alto.get_lines_in_text_block(alto.get_text_blocks()[0])] == \
+            [expected.get_text_in_line(line) for line in expected.get_lines_in_text_block(expected.get_text_blocks()[0])]
+    with pytest.raises(etree.XMLSyntaxError):
+        Alto.fromchunks([content[:100]])
+
+@pytest.mark.parametrize('xmlns', ['http://www.loc.gov/standards/alto/ns-v3#',
+                                   'http://www.loc.gov/standards/alto/ns-v4#',
+                                   'http://schema.ccs-gmbh.com/ALTO',
+                                   None])
+def test_namespaces(xmlns):
+    """
+    Test reading ALTO in any namespace (or none) as it is.
+    """
+    xml = f'''<alto{f' xmlns="{xmlns}"' if xmlns else ''}><Layout><Page><PrintSpace>
+    <TextBlock ID="TB1"><TextLine ID="TL1"><String CONTENT="Zei"/><HYP CONTENT="-"/></TextLine>
+    <TextLine ID="TL2"><String CONTENT="le"/><SP/><String CONTENT="zwei"/></TextLine></TextBlock>
+    </PrintSpace></Page></Layout></alto>'''.encode()
+    alto = Alto.frombytes(xml)
+    assert alto.tree.tag == (f"{{{xmlns}}}alto" if xmlns else "alto")
+    blocks = alto.get_text_blocks()
+    assert len(blocks) == 1
+    assert [alto.get_text_in_line(line) for line in alto.get_lines_in_text_block(blocks[0])] == ["Zei-", "le zwei"]
+
+def test_text_only(datadir):
+    """
+    Test reading only the text blocks and lines of ALTO into records.
+    """
+    from io import BytesIO
+
+    from mets_mods2tei.api.alto import TextBlock, TextLine
+
+    def text(alto):
+        return [[(alto.get_line_id(line), alto.get_text_in_line(line)) for line in alto.get_lines_in_text_block(block)]
+                for block in alto.get_text_blocks()]
+
+    xml = b'''<alto xmlns="http://www.loc.gov/standards/alto/ns-v3#"><Layout><Page><PrintSpace>
+    <TextBlock ID="TB1"><Shape/><TextLine><String CONTENT="Zei"><Glyph CONTENT="Z"/></String><HYP CONTENT="-"/></TextLine>
+    <!-- comment --><TextLine ID="TL2"><String CONTENT="le"/><SP/><String CONTENT="zwei"/></TextLine></TextBlock>
+    <Illustration ID="I1"/><TextBlock ID="TB2"/>
+    <ComposedBlock><TextBlock><TextLine/><TextLine><String CONTENT="drei"/></TextLine></TextBlock></ComposedBlock>
+    </PrintSpace></Page></Layout></alto>'''
+    expected = text(Alto.frombytes(xml))
+    assert expected == [[("TB1_0001", "Zei-"), ("TL2", "le zwei")], [], [("None_0000", ""), ("None_0001", "drei")]]
+    alto = Alto.frombytes(xml)
+    assert [alto.get_line_ids(alto.get_lines_in_text_block(block)) for block in alto.get_text_blocks()] == \
+        [[line_id for line_id, _ in lines] for lines in expected]
+    for alto in (Alto.frombytes(xml, text_only=True),
+                 Alto.fromchunks([xml[:100], xml[100:]], text_only=True),
+                 Alto.fromfile(BytesIO(xml), text_only=True)):
+        assert alto.tree is None
+        assert all(isinstance(block, TextBlock) for block in alto.get_text_blocks())
+        assert isinstance(alto.get_text_blocks()[0].lines[0], TextLine)
+        assert text(alto) == expected
+    alto = Alto.read(str(datadir.join('test_alto.xml')), text_only=True)
+    assert text(alto) == text(Alto.read(str(datadir.join('test_alto.xml'))))
@@ -1,8 +1,12 @@
 from click.testing import CliRunner
 # -*- coding: utf-8 -*-
 
+from pathlib import Path
+
 from mets_mods2tei import cli
 
+TESTS = Path(__file__).parent
+
 def test_help():
 
     runner = CliRunner()
@@ -15,8 +19,115 @@ def test_failure():
     result = runner.invoke(cli, [])
     assert(result.exit_code == 2)
 
+def test_unknown_heading_tier():
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['-H', 'regex', 'tests/test_mets/test_mets.xml'])
+    assert(result.exit_code == 2)
+
 def test_test_file():
 
     runner = CliRunner()
     result = runner.invoke(cli, ['tests/test_mets/test_mets.xml'], catch_exceptions=False)
     assert result.exit_code == 0, result.stdout
+
+def test_compact(tmp_path):
+
+    runner = CliRunner()
+    output = tmp_path / 'tei.xml'
+    result = runner.invoke(cli, ['-C', '-o', '-O', str(output), f'{TESTS}/test_mets/test_mets_nodiv_local.xml'],
+                           catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+    assert b'<lb/>' in output.read_bytes()
+    assert b'\n      <div' not in output.read_bytes()
+
+def test_failed_output(tmp_path):
+    """
+    Test that a failed conversion leaves the output file as it was.
+    """
+    output = tmp_path / 'tei.xml'
+    output.write_bytes(b'old')
+    runner = CliRunner()
+    result = runner.invoke(cli, ['-O', str(output), f'{TESTS}/test_mets/non_existent.xml'])
+    assert result.exit_code != 0
+    assert output.read_bytes() == b'old'
+    assert [path.name for path in tmp_path.iterdir()] == ['tei.xml']
+
+def test_output_mode(tmp_path):
+    """
+    Test that a replaced output file keeps its permissions, and a new one gets those of the umask.
+    """
+    import os
+    import stat
+
+    output = tmp_path / 'tei.xml'
+    output.write_bytes(b'old')
+    output.chmod(0o640)
+    runner = CliRunner()
+    result = runner.invoke(cli, ['-O', str(output), f'{TESTS}/test_mets/test_mets_nodiv_local.xml'])
+    assert result.exit_code == 0, result.output
+    assert output.read_bytes().startswith(b'<?xml')
+    assert stat.S_IMODE(output.stat().st_mode) == 0o640
+    umask = os.umask(0)
+    os.umask(umask)
+    new = tmp_path / 'new.xml'
+    result = runner.invoke(cli, ['-O', str(new), f'{TESTS}/test_mets/test_mets_nodiv_local.xml'])
+    assert result.exit_code == 0, result.output
+    assert stat.S_IMODE(new.stat().st_mode) == 0o666 & ~umask
+
+def test_batch_files(tmp_path):
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['-D', str(tmp_path), f'{TESTS}/test_mets/test_mets_nodiv_local.xml',
+                                 f'{TESTS}/test_tei/test_mets_nodiv_local.xml', '--ocr'],
+                           catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / 'test_mets_nodiv_local.tei.xml').read_bytes().count(b'<lb') > 800
+    assert (tmp_path / 'test_mets_nodiv_local_0001.tei.xml').exists()
+    # (the session and matcher of the batch are not left behind)
+    from mets_mods2tei.scripts import mets_mods2tei
+    assert mets_mods2tei._session is None and mets_mods2tei._matcher is None
+
+def test_batch_manifest_jobs(tmp_path):
+
+    manifest = tmp_path / 'manifest.txt'
+    manifest.write_text('# comment\n'
+                        f'{TESTS}/test_mets/test_mets.xml\n'
+                        '\n'
+                        f'{TESTS}/test_tei/test_mets.xml\tother.xml\n'
+                        f'{TESTS}/test_mets/non_existent.xml\n')
+    runner = CliRunner()
+    result = runner.invoke(cli, ['-B', str(manifest), '-D', str(tmp_path / 'out'), '-j', '2'])
+    assert result.exit_code == 1
+    assert (tmp_path / 'out' / 'test_mets.tei.xml').exists()
+    assert (tmp_path / 'out' / 'other.xml').exists()
+    assert not (tmp_path / 'out' / 'non_existent.tei.xml').exists()
+    assert "converted 2 of 3 METS" in result.output
+
+def test_batch_outputs(tmp_path):
+    """
+    Test that batch entries never share an output file.
+    """
+    from mets_mods2tei.scripts.mets_mods2tei import _batch_outputs
+
+    entries = [('a/doc.xml', None), ('b/doc.xml', None), ('c.xml', 'doc_0001.tei.xml'),
+               ('d.xml', 'x.xml'), ('e.xml', './x.xml')]
+    outputs = [Path(path).name for _, path in _batch_outputs(entries, str(tmp_path))]
+    assert outputs == ['doc.tei.xml', 'doc_0001.tei.xml', 'doc_0001_0002.tei.xml', 'x.xml', 'x_0004.xml']
+
+def test_report_all():
+    """
+    Test that the heading matches of all batch documents are summed up.
+    """
+    from mets_mods2tei.scripts.mets_mods2tei import _report_all
+
+    results = [('a.xml', 'a.tei.xml', None, {'exact': 1, 'fuzzy': 2}),
+               ('b.xml', 'b.tei.xml', "OSError: gone", {'none': 1}),
+               ('c.xml', 'c.tei.xml', None, {'exact': 3, 'none': 0})]
+    assert _report_all(iter(results)) == (1, {'exact': 4, 'normalized': 0, 'fuzzy': 2, 'none': 1})
+
+def test_batch_without_output_dir():
+
+    runner = CliRunner()
+    result = runner.invoke(cli, [f'{TESTS}/test_mets/test_mets.xml', f'{TESTS}/test_tei/test_mets.xml'])
+    assert result.exit_code == 2
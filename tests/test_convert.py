@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+import os
+from pathlib import Path
+
+from mets_mods2tei import convert, convert_many
+
+TESTS = Path(__file__).parent
+
+def test_convert_does_not_change_cwd(tmp_path, monkeypatch):
+    """
+    Test converting a local METS with relative ALTO refs from another directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    tei = convert(str(TESTS / 'test_mets' / 'test_mets_nodiv_local.xml'), ocr=True)
+    assert os.getcwd() == str(tmp_path)
+    assert tei.count(b'<lb') > 800
+
+def test_convert_many():
+    """
+    Test converting several METS concurrently, including a failing one.
+    """
+    sources = [str(TESTS / 'test_mets' / 'test_mets_nodiv_local.xml'),
+               str(TESTS / 'test_mets' / 'non_existent.xml'),
+               str(TESTS / 'test_mets' / 'test_mets_nodiv_local.xml')]
+    expected = convert(sources[0], ocr=True, refs=['line'])
+    results = list(convert_many(sources, max_workers=3, ocr=True, refs=['line']))
+    assert [source for source, _ in results] == sources
+    assert results[0][1] == expected
+    assert isinstance(results[1][1], FileNotFoundError)
+    assert results[2][1] == expected
+
+def test_convert_prefetch():
+    """
+    Test that prefetching ALTO files does not change the TEI.
+    """
+    source = str(TESTS / 'test_mets' / 'test_mets_nodiv_local.xml')
+    assert convert(source, ocr=True, refs=['line'], prefetch=8) == convert(source, ocr=True, refs=['line'])
+
+def test_convert_output(tmp_path):
+    """
+    Test streaming the TEI to a file.
+    """
+    source = str(TESTS / 'test_mets' / 'test_mets_nodiv_local.xml')
+    with open(tmp_path / 'out.xml', 'wb') as output:
+        assert convert(source, ocr=True, refs=['line'], output=output) is None
+    assert (tmp_path / 'out.xml').read_bytes() == convert(source, ocr=True, refs=['line'])
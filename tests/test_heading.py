@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from mets_mods2tei import Alto, HeadingMatcher, LayoutHints
+
+
+def make_alto(text):
+    alto = Alto()
+    alto.text = text
+    return alto
+
+def test_unknown_tier():
+    """
+    Test that only known tiers and distances are accepted.
+    """
+    with pytest.raises(ValueError):
+        HeadingMatcher(['regex'])
+    with pytest.raises(ValueError):
+        HeadingMatcher(max_distance=2)
+
+def test_tiers():
+    """
+    Test that tiers are tried in order and counted.
+    """
+    alto = make_alto("Vorrede. Text. Erſtes Kapitel, Text. Von der Ge-\nſchichte. Text. Register")
+    matcher = HeadingMatcher(['exact', 'normalized', 'fuzzy'])
+    # exact (ignoring case)
+    assert matcher.match(alto, "ERſTES KAPITEL") == (15, 14)
+    # normalized
+    assert matcher.match(alto, "Von der Geſchichte") == (37, 20)
+    # fuzzy
+    begin, length = matcher.match(alto, "Regiſter")
+    assert begin == alto.get_best_insert_index("Regiſter", True)[0]
+    assert matcher.stats == {'exact': 1, 'normalized': 1, 'fuzzy': 1, 'none': 0}
+
+def test_fallback():
+    """
+    Test that labels too far from the text are not matched.
+    """
+    alto = make_alto("Vorrede. Text. Erſtes Kapitel, Text. Register")
+    matcher = HeadingMatcher(['exact', 'normalized'])
+    assert matcher.match(alto, "Anhang") is None
+    matcher = HeadingMatcher(['fuzzy'], max_distance=0.2)
+    assert matcher.match(alto, "Anhang") is None
+    assert matcher.match(alto, "Vorredde") == (0, 8)
+    assert matcher.stats == {'exact': 0, 'normalized': 0, 'fuzzy': 1, 'none': 1}
+
+def test_threads():
+    """
+    Test that tiers are counted correctly by threads sharing a matcher.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    alto = make_alto("Vorrede. Text. Erſtes Kapitel, Text. Register")
+    matcher = HeadingMatcher(['exact'])
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda label: matcher.match(alto, label), ["Vorrede", "Anhang"] * 2000))
+    assert matcher.stats == {'exact': 2000, 'normalized': 0, 'fuzzy': 0, 'none': 2000}
+
+def test_prepare():
+    """
+    Test that preparing a page searches only labels which need the fuzzy tier.
+    """
+    alto = make_alto("Vorrede. Text. Erſtes Kapitel, Text. Register")
+    matcher = HeadingMatcher(['exact', 'fuzzy'])
+    matcher.prepare(alto, ["Vorrede", "Regiſter"])
+    assert list(alto.matches) == [("regiſter", True, 0)]
+    assert matcher.match(alto, "Regiſter") == alto.matches["regiſter", True, 0]
+    assert matcher.stats == {'exact': 0, 'normalized': 0, 'fuzzy': 1, 'none': 0}
+
+LAYOUT = '''<?xml version="1.0" encoding="UTF-8"?>
+<alto xmlns="http://www.loc.gov/standards/alto/ns-v4#">
+  <Styles>
+    <TextStyle ID="TS10" FONTSIZE="10"/>
+    <TextStyle ID="TS20" FONTSIZE="20"/>
+  </Styles>
+  <Layout>
+    <Page ID="P1">
+      <PrintSpace>
+        <TextBlock ID="TB1" VPOS="100" HEIGHT="40" STYLEREFS="TS10">
+          <TextLine><String CONTENT="Kolumnentitel"/></TextLine>
+        </TextBlock>
+        <TextBlock ID="TB2" VPOS="200" HEIGHT="120" STYLEREFS="TS10">
+          <TextLine><String CONTENT="erster"/></TextLine>
+          <TextLine><String CONTENT="Absatz"/></TextLine>
+          <TextLine><String CONTENT="Text"/></TextLine>
+        </TextBlock>
+        <TextBlock ID="TB3" VPOS="400" HEIGHT="120" STYLEREFS="TS20">
+          <TextLine><String CONTENT="Große"/></TextLine>
+          <TextLine><String CONTENT="Überschrift"/></TextLine>
+          <TextLine><String CONTENT="hier"/></TextLine>
+        </TextBlock>
+        <TextBlock ID="TB4" VPOS="600" HEIGHT="120">
+          <TextLine><String CONTENT="zweiter"/></TextLine>
+          <TextLine><String CONTENT="Absatz"/></TextLine>
+          <TextLine><String CONTENT="Text"/></TextLine>
+        </TextBlock>
+        <TextBlock ID="TB5" VPOS="800" HEIGHT="240">
+          <TextLine><String CONTENT="hohe"/></TextLine>
+          <TextLine><String CONTENT="Zeilen"/></TextLine>
+          <TextLine><String CONTENT="zum Ende"/></TextLine>
+        </TextBlock>
+      </PrintSpace>
+    </Page>
+  </Layout>
+</alto>'''.encode()
+
+def make_page(text_only):
+    from lxml import etree
+
+    alto = Alto.frombytes(LAYOUT, text_only)
+    par = etree.Element("p")
+    for block in alto.get_text_blocks():
+        alto.add_block(block)
+        for line in alto.get_lines_in_text_block(block):
+            alto.add_line(etree.SubElement(par, "lb"), alto.get_text_in_line(line))
+    return alto
+
+@pytest.mark.parametrize("text_only", [False, True])
+def test_layout_candidates(text_only):
+    """
+    Test detecting the top, short and large-font blocks of a page.
+    """
+    alto = make_page(text_only)
+    assert alto.get_font_sizes() == {'TS10': 10.0, 'TS20': 20.0}
+    text = alto.text
+    # TB1 (top and short), TB3 (by font size) and TB5 (by line height)
+    assert [text[begin:end] for begin, end in LayoutHints(top=1).candidates(alto)] == \
+        ["Kolumnentitel", "GroßeÜberschrifthier", "hoheZeilenzum Ende"]
+    # TB2 (top)
+    assert len(LayoutHints(top=2).candidates(alto)) == 4
+    assert LayoutHints(top=0, font_ratio=3, max_lines=0).candidates(alto) == []
+    # also once the ALTO file is released
+    candidates = LayoutHints(top=1).candidates(alto)
+    alto.release()
+    assert alto.tree is None and alto.get_text_blocks() == []
+    assert LayoutHints(top=1).candidates(alto) == candidates
+
+def test_layout_matching():
+    """
+    Test searching candidate blocks first, and widening to the full page.
+    """
+    alto = make_page(True)
+    matcher = HeadingMatcher(['exact', 'fuzzy'], layout=LayoutHints(top=1))
+    # in a candidate block
+    assert matcher.match(alto, "Überschrift") == (alto.text.index("Überschrift"), 11)
+    assert matcher.match(alto, "Grosse Uberschrift") == (alto.text.index("Große"), 18)
+    # only on the full page
+    assert matcher.match(alto, "zweiter Absatz") == (alto.text.index("zweiter"), 14)
+    assert matcher.stats == {'exact': 1, 'normalized': 0, 'fuzzy': 2, 'none': 0}
+
+def test_layout_seams():
+    """
+    Test that no match spans two candidate blocks.
+    """
+    alto = make_page(True)
+    matcher = HeadingMatcher(['exact', 'normalized'], layout=LayoutHints(top=1))
+    # TB1 and TB3 are candidates (but not adjacent on the page)
+    assert matcher.match(alto, "Kolumnentitel Große") is None
+    assert matcher.match(alto, "Kolumnentitel") == (0, 13)
+    # the closest fuzzy match in any block (here TB5)
+    matcher = HeadingMatcher(['fuzzy'], layout=LayoutHints(top=1))
+    begin, length = matcher.match(alto, "Zeilen zum Ende")
+    assert alto.text.index("hohe") <= begin and begin + length <= len(alto.text)
+    assert matcher.stats == {'exact': 0, 'normalized': 0, 'fuzzy': 1, 'none': 0}
+
+def test_indexes():
+    """
+    Test which text indexes the tiers search.
+    """
+    assert HeadingMatcher().indexes == [(True, False)]
+    assert HeadingMatcher(['exact', 'normalized'], ignore_case=False).indexes == [(False, False), (False, True)]
@@ -22,6 +22,22 @@ def datadir(tmpdir, request):
                 dest_path.write_bytes(src_path.read_bytes())
     return tmpdir
 
+@pytest.fixture(autouse=True, params=['generateds', 'lxml'])
+def engine(request, monkeypatch):
+    """
+    Fixture running each test with both engines for reading METS/MODS.
+    """
+    monkeypatch.setattr(Mets, 'engine', request.param)
+    return request.param
+
+@pytest.fixture(autouse=True, params=[False, True], ids=['tree', 'streaming'])
+def streaming(request, monkeypatch):
+    """
+    Fixture running each test with and without streaming.
+    """
+    monkeypatch.setattr(Mets, 'streaming', request.param)
+    return request.param
+
 def test_constructor():
     """
     Test the creation of an empty METS instance.
@@ -578,3 +594,197 @@ def test_mets_slub_license_and_origin_info_date_start():
     assert mets.get_dates() == {"start": "1850"}
     assert mets.get_license() == "CC-BY 4.0"
     assert mets.get_license_url() == "http://example.org/license"
+
+def test_base_location(datadir):
+    """
+    Test the base directory/URL for relative file references.
+    """
+    from io import BytesIO
+    mets = Mets.read(str(datadir.join('test_mets.xml')))
+    assert mets.wd == str(datadir)
+
+    class Download(BytesIO):
+        url = "https://example.org/data/mets.xml"
+    mets = Mets()
+    mets.fromfile(Download(Path(datadir.join('test_mets.xml')).read_bytes()))
+    assert mets.wd == "https://example.org/data/mets.xml"
+
+def test_single_parse_xml_data():
+    """
+    Test that embedded MODS/DV data is built from the parsed elements (also with comments).
+    """
+    from io import BytesIO
+    from lxml import etree
+    xml_content = b'''<?xml version="1.0" encoding="UTF-8"?>
+<!-- exported by some tool -->
+<mets:mets xmlns:mets="http://www.loc.gov/METS/" xmlns:mods="http://www.loc.gov/mods/v3" xmlns:dv="http://dfg-viewer.de/">
+  <mets:dmdSec ID="DMD1">
+    <mets:mdWrap MDTYPE="MODS">
+      <mets:xmlData>
+        <mods:mods>
+          <!-- main title -->
+          <mods:titleInfo>
+            <mods:title>Commented Title</mods:title>
+          </mods:titleInfo>
+        </mods:mods>
+      </mets:xmlData>
+    </mets:mdWrap>
+  </mets:dmdSec>
+  <mets:amdSec>
+    <mets:rightsMD ID="RIGHTS1">
+      <mets:mdWrap MDTYPE="OTHER">
+        <mets:xmlData>
+          <dv:rights>
+            <dv:owner>SLUB Dresden</dv:owner>
+          </dv:rights>
+        </mets:xmlData>
+      </mets:mdWrap>
+    </mets:rightsMD>
+  </mets:amdSec>
+</mets:mets>'''
+    mets = Mets(engine='generateds')
+    mets.fromfile(BytesIO(xml_content))
+    mods = mets.mets.get_dmdSec()[0].get_mdWrap().get_xmlData().get_anytypeobjs_()[0]
+    assert isinstance(mods, etree._Element)
+    assert mods.getroottree().getroot() is mets.tree.getroot()
+    assert mets.get_main_title() == "Commented Title"
+    assert mets.get_owner_digital() == "SLUB Dresden"
+
+def _data(mets):
+    """
+    Return the extracted data of a METS instance for comparison.
+    """
+    names = ['title', 'sub_titles', 'part_titles', 'volume_titles', 'biblevel', 'bibtype', 'authors', 'editors',
+             'notes', 'places', 'dates', 'publishers', 'edition', 'languages', 'scripts', 'classifications',
+             'subjects', 'digital_origin', 'extents', 'owner_digital', 'license', 'license_url', 'encoding_date',
+             'encoding_desc', 'shelf_locators', 'location_phys', 'location_urls', 'identifiers', 'collections',
+             'struct_links', 'wd']
+    data = {name: getattr(mets, name) for name in names}
+    for name in ['page_index_map', 'order_map', 'orderlabel_map', 'img_map', 'alto_map']:
+        data[name] = dict(getattr(mets, name))
+    return data
+
+def test_engines(subtests, datadir):
+    """
+    Test that both engines extract the same data.
+    """
+    for name in ['test_mets.xml', 'test_mets_nodiv.xml']:
+        with subtests.test(name):
+            mets1 = Mets.read(str(datadir.join(name)), engine='generateds')
+            mets2 = Mets.read(str(datadir.join(name)), engine='lxml')
+            assert _data(mets1) == _data(mets2)
+            assert mets1.page_map.keys() == mets2.page_map.keys()
+            div1, div2 = mets1.get_div_structure(), mets2.get_div_structure()
+            assert (div1 is None) == (div2 is None)
+            while div1 is not None:
+                assert [div.get_ID() for div in div1.get_div()] == [div.get_ID() for div in div2.get_div()]
+                assert div1.get_ADMID() == div2.get_ADMID()
+                div1 = div1.get_div()[0] if div1.get_div() else None
+                div2 = div2.get_div()[0] if div2.get_div() else None
+    with subtests.test("unknown engine"):
+        with pytest.raises(ValueError):
+            Mets(engine='xslt')
+
+def test_lxml_engine_imports(datadir):
+    """
+    Test that the lxml engine does not need the generateDS modules.
+    """
+    import subprocess
+    import sys
+    script = (
+        "import sys\n"
+        "from mets_mods2tei import Mets\n"
+        f"mets = Mets.read({str(datadir.join('test_mets.xml'))!r}, engine='lxml')\n"
+        "assert mets.get_struct_links('LOG_0000')\n"
+        "assert 'mets_mods2tei.api.mets_generateds' not in sys.modules\n"
+        "assert 'mets_mods2tei.api.mods_generateds' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, '-c', script], check=True)
+
+def test_streaming(datadir):
+    """
+    Test that streaming yields the same data, but drops the consumed sections.
+    """
+    from lxml import etree
+    from mets_mods2tei.api.util import NS
+    mets1 = Mets.read(str(datadir.join('test_mets.xml')), streaming=False)
+    mets2 = Mets.read(str(datadir.join('test_mets.xml')), streaming=True)
+    assert _data(mets1) == _data(mets2)
+    assert list(mets1.page_map) == list(mets2.page_map)
+    assert mets2.page_map['PHYS_0005'].get_ORDERLABEL() == mets1.page_map['PHYS_0005'].get_ORDERLABEL()
+    assert not etree.XPath('//mets:file|//mets:div/mets:div/mets:fptr|//mets:smLink', namespaces=NS)(mets2.tree)
+    assert mets2.get_div_structure() is not None
+
+def test_page_table(datadir):
+    """
+    Test the page table and its mapping views.
+    """
+    mets = Mets.read(str(datadir.join('test_mets.xml')))
+    assert len(mets.pages) == len(mets.page_map) == 808
+    assert mets.pages.at(4) == 'PHYS_0005'
+    assert mets.page_index_map['PHYS_0005'] == 4
+    assert mets.get_order('PHYS_0005') == 5
+    assert list(mets.alto_map)[:2] == ['PHYS_0001', 'PHYS_0002']
+    assert mets.get_struct_links('LOG_0000')[0] is mets.pages.ids[0]
+
+    mets.alto_map = {'PHYS_0002': 'a.xml', 'NEW': 'b.xml'}
+    assert dict(mets.alto_map) == {'PHYS_0002': 'a.xml', 'NEW': 'b.xml'}
+    assert mets.get_alto('PHYS_0001') == ''
+    assert mets.get_alto('NEW') == 'b.xml'
+    assert 'NEW' not in mets.page_index_map
+    assert 'NEW' not in mets.page_map
+    del mets.alto_map['NEW']
+    assert mets.get_alto('NEW') == ''
+    with pytest.raises(KeyError):
+        del mets.alto_map['NEW']
+    # (lengths are counted, not searched)
+    assert len(mets.alto_map) == 1
+    mets.alto_map['PHYS_0002'] = 'c.xml'
+    assert len(mets.alto_map) == 1
+    assert all(len(getattr(mets, name)) == sum(1 for _ in getattr(mets, name))
+               for name in ['page_map', 'page_index_map', 'order_map', 'orderlabel_map', 'img_map', 'alto_map'])
+
+def test_lazy_fields(datadir, streaming):
+    """
+    Test that the metadata are read on first access only, by group.
+    """
+    mets = Mets.read(str(datadir.join('test_mets.xml')))
+    assert 'title' not in vars(mets)
+    # (pages are read while parsing when streaming)
+    assert ('pages' in vars(mets)) == streaming
+    assert mets.get_main_title().startswith("Geschichte der Mission")
+    assert 'sub_titles' in vars(mets)
+    assert 'languages' not in vars(mets)
+    assert mets.get_alto('PHYS_0005').endswith('00000005.xml')
+    assert 'struct_links' in vars(mets)
+    assert 'languages' not in vars(mets)
+    # assignments override
+    mets.languages = {'eng': 'Englisch'}
+    assert mets.get_languages() == {'eng': 'Englisch'}
+    # and reading another file resets
+    mets.fromfile(str(datadir.join('test_mets_nodiv.xml')))
+    assert 'languages' not in vars(mets)
+    assert mets.get_languages() == {'ger': 'Deutsch'}
+
+
+def test_language_names(caplog):
+    """
+    Test that language names come from the precompiled table (as babel would
+    name them), with unknown codes cached and logged.
+    """
+    import babel
+
+    from mets_mods2tei.api.mets import Iso15924, _babel_language_name, _language_name, _language_names
+
+    assert Iso15924().map is Iso15924().map
+    names = _language_names()
+    for code in ('ger', 'de', 'lat', 'fre', 'eng'):
+        assert names[code] == babel.Locale.parse(code).get_language_name('de')
+    _babel_language_name.cache_clear()
+    assert _language_name('ger') == 'Deutsch'
+    assert _babel_language_name.cache_info().currsize == 0
+    assert _language_name('invalidlangcode') is None
+    assert _language_name('invalidlangcode') is None
+    assert _babel_language_name.cache_info().hits == 1
+    assert Mets()._Mets__language_name('invalidlangcode') == 'Unbekannt'
+    assert "unknown locale 'invalidlangcode'. Falling back to 'Unbekannt'" in caplog.text
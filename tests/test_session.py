@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from requests.adapters import Retry
+
+from mets_mods2tei import HttpSession, Mets, Tei
+
+TESTS = Path(__file__).parent
+
+
+class Handler(SimpleHTTPRequestHandler):
+    # keep-alive
+    protocol_version = "HTTP/1.1"
+    # avoid waiting for delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """
+    Fixture serving the METS test data via HTTP on localhost.
+    """
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), partial(Handler, directory=str(TESTS / 'test_mets')))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_retries():
+    """
+    Test configuring the retry policy.
+    """
+    session = HttpSession(pool_size=2, retries=5, backoff_factor=0.5)
+    assert session.adapter.max_retries.total == 5
+    assert session.adapter.max_retries.backoff_factor == 0.5
+    assert 503 in session.adapter.max_retries.status_forcelist
+    retry = Retry(total=1)
+    assert HttpSession(retries=retry).adapter.max_retries is retry
+    assert session.stats == {'requests': 0, 'connections': 0, 'reused': 0}
+
+def test_connection_reuse(server):
+    """
+    Test fetching remote ALTO files of several documents over one connection.
+    """
+    mets = Mets.read(str(TESTS / 'test_mets' / 'test_mets_nodiv_local.xml'))
+    mets.wd = server + 'test_mets_nodiv_local.xml'
+    pages = len(set(mets.alto_map.values()))
+    with HttpSession() as session:
+        for _ in range(2):
+            tei = Tei()
+            tei.fill_from_mets(mets, session=session)
+            assert len(tei.alto_map) == pages
+        stats = session.stats
+    assert stats == {'requests': 2 * pages, 'connections': 1, 'reused': 2 * pages - 1}
+    # also counted once closed
+    assert session.stats == stats
+
+def test_prefetch(server):
+    """
+    Test that fetching remote ALTO files concurrently yields the same TEI.
+    """
+    mets = Mets.read(str(TESTS / 'test_mets' / 'test_mets_nodiv_local.xml'))
+    mets.wd = server + 'test_mets_nodiv_local.xml'
+    results = []
+    for prefetch in (0, 4):
+        with HttpSession() as session:
+            tei = Tei()
+            tei.fill_from_mets(mets, refs=['page', 'line'], session=session, prefetch=prefetch)
+            results.append(tei.tostring())
+        assert session.stats['requests'] == len(tei.alto_map)
+    assert results[0] == results[1]
@@ -46,6 +46,13 @@ def test_reading_local_file(subtests, datadir, monkeypatch):
         def __init__(self, content):
             self.content = content
 
+        def iter_content(self, chunk_size=1):
+            for i in range(0, len(self.content), chunk_size):
+                yield self.content[i:i + chunk_size]
+
+        def close(self):
+            pass
+
     def mock_get(self_session, url, *args, **kwargs):
         filename = url.split('/')[-1]
         local_path = Path(datadir) / "FULLTEXT" / filename
@@ -111,6 +118,13 @@ def test_reading_remote_url(tmpdir, datadir, monkeypatch):
         def __init__(self, content):
             self.content = content
 
+        def iter_content(self, chunk_size=1):
+            for i in range(0, len(self.content), chunk_size):
+                yield self.content[i:i + chunk_size]
+
+        def close(self):
+            pass
+
     def mock_get(self_session, url, *args, **kwargs):
         filename = url.split('/')[-1]
         local_path = Path(__file__).parent / "test_mets" / "FULLTEXT" / filename
@@ -1217,3 +1231,263 @@ def test_tei_ocr_error_handling_and_path_variations(monkeypatch):
 
     # Should run without raising uncaught exceptions
     tei.add_ocr_text(mets)
+
+def test_tei_ocr_relative_to_remote_mets(monkeypatch):
+    """
+    Test resolving relative ALTO refs against the URL of a downloaded METS.
+    """
+    import requests
+    from lxml import etree
+
+    xml_alto = b'<?xml version="1.0" encoding="UTF-8"?><alto xmlns="http://www.loc.gov/standards/alto/ns-v4#"><Layout><Page ID="P1"><PrintSpace><TextBlock ID="TB1"><TextLine ID="TL1"><String CONTENT="Remote"/></TextLine></TextBlock></PrintSpace></Page></Layout></alto>'
+    urls = []
+
+    class MockResponse:
+        content = xml_alto
+
+        def iter_content(self, chunk_size=1):
+            yield self.content
+
+        def close(self):
+            pass
+
+    def mock_get(self_session, url, *args, **kwargs):
+        urls.append(url)
+        return MockResponse()
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+
+    mets = Mets()
+    mets.wd = "https://example.org/data/mets.xml"
+    mets.alto_map = {"P1": "ocr/00000001.xml"}
+    mets.struct_links = {"DIV1": ["P1"]}
+    mets.page_map = {"P1": None}
+
+    tei = Tei()
+    body = tei.tree.xpath('//tei:body', namespaces=NS)[0]
+    node = etree.SubElement(body, f"{{{NS['tei']}}}div")
+    node.set("id", "DIV1")
+    tei.add_ocr_text(mets)
+
+    assert urls == ["https://example.org/data/ocr/00000001.xml"]
+    assert len(tei.tree.xpath('//tei:lb', namespaces=NS)) == 1
+
+def test_skeleton_template():
+    """
+    Test that each TEI instance gets its own copy of the skeleton.
+    """
+    from lxml import etree
+
+    from mets_mods2tei.api.tei import SKELETON_ANCHORS, _skeleton
+
+    tei1 = Tei()
+    tei1.set_main_title("First")
+    tei1.add_sub_title("Sub")
+    tei2 = Tei()
+    assert tei2.main_title == "[Haupttitel]"
+    assert tei2.subtitles == []
+    assert tei1.main_title == "First"
+    template, _ = _skeleton()
+    assert template.getroot() is not tei2.tree.getroot()
+    assert etree.tostring(template) == etree.tostring(tei2.tree)
+    # the anchors are those of the copy
+    for pattern in SKELETON_ANCHORS:
+        assert tei2.xpath(pattern) == pattern(tei2.tree)
+
+def test_anchors():
+    """
+    Test that header and text elements are resolved via the skeleton anchors.
+    """
+    from mets_mods2tei.api.tei import XPATH_BIBLFULL_TIT, XPATH_BODY, XPATH_BODY_DIV, XPATH_EDN, XPATH_TIT
+
+    tei = Tei()
+    title_stmt = tei.xpath(XPATH_TIT)[0]
+    assert tei.xpath(XPATH_BIBLFULL_TIT) == []
+    tei.init_biblFull()
+    tei.add_author({"family": "Doe"}, "personal")
+    assert tei.xpath(XPATH_TIT) == [title_stmt]
+    assert tei.xpath(XPATH_BIBLFULL_TIT) == XPATH_BIBLFULL_TIT(tei.tree)
+    assert len(tei.xpath(XPATH_BIBLFULL_TIT)[0].findall('tei:author', namespaces=NS)) == 1
+    tei.add_digital_edition("digital")
+    assert tei.xpath(XPATH_EDN) == XPATH_EDN(tei.tree)
+    tei.add_physical_pages([])
+    assert tei.xpath(XPATH_BODY_DIV) == []
+    assert tei.xpath(XPATH_BODY)[0].getparent().getparent() is tei.tree.getroot()
+
+def test_text_only(datadir):
+    """
+    Test converting OCR from ALTO text records instead of trees.
+    """
+    results = []
+    for text_only in (False, True):
+        mets = Mets.read(str(datadir.join('test_mets_nodiv_local.xml')))
+        tei = Tei(text_only=text_only)
+        tei.fill_from_mets(mets, refs=['line'])
+        assert all((alto.tree is None) == text_only for alto in tei.alto_map.values())
+        results.append(tei.tostring())
+    assert results[0] == results[1]
+
+def test_evict(datadir):
+    """
+    Test dropping ALTO files once their text has been added.
+    """
+    results = []
+    for evict in (False, True):
+        mets = Mets.read(str(datadir.join('test_mets_nodiv_local.xml')))
+        tei = Tei(evict=evict)
+        tei.fill_from_mets(mets, refs=['line'])
+        assert len(tei.alto_map) == 56
+        assert all((alto is None) == evict for alto in tei.alto_map.values())
+        results.append(tei.tostring())
+    assert results[0] == results[1]
+
+def test_write(datadir):
+    """
+    Test serializing one top-level div at a time.
+    """
+    import io
+
+    from mets_mods2tei.api.tei import XPATH_BODY_DIV
+
+    mets = Mets.read(str(datadir.join('test_mets_nodiv_local.xml')))
+    tei = Tei()
+    tei.fill_from_mets(mets, refs=['page', 'line'])
+    expected = tei.tostring()
+    tei = Tei()
+    tei.fill_from_mets(mets, refs=['page', 'line'])
+    output = io.BytesIO()
+    tei.write(output)
+    assert output.getvalue() == expected
+    assert tei.xpath(XPATH_BODY_DIV) == []
+
+@pytest.mark.parametrize("refs", [['line'], ['page', 'line']])
+def test_streaming(datadir, refs):
+    """
+    Test writing top-level divs as soon as their text is complete.
+    """
+    import io
+
+    mets = Mets.read(str(datadir.join('test_mets_nodiv_local.xml')))
+    tei = Tei(evict=True)
+    tei.fill_from_mets(mets, refs=refs)
+    expected = tei.tostring()
+
+    tei = Tei(evict=True)
+    # how many ALTO files had been read at each write
+    pages = []
+
+    class Output(io.BytesIO):
+        def write(self, data):
+            pages.append(len(tei.alto_map))
+            return super().write(data)
+
+    output = Output()
+    tei.fill_from_mets(mets, refs=refs, output=output)
+    assert output.getvalue() == expected
+    if 'page' in refs:
+        # after the facsimile is complete
+        assert set(pages) == {56}
+    else:
+        # header first, then one div after another
+        assert pages[0] == 0
+        assert pages == sorted(pages) and len(set(pages)) > 50
+
+def test_compact(datadir):
+    """
+    Test serializing without indentation.
+    """
+    import io
+
+    from lxml import etree
+
+    mets = Mets.read(str(datadir.join('test_mets_nodiv_local.xml')))
+    texts = []
+    for compact in (False, True):
+        tei = Tei(compact=compact)
+        tei.fill_from_mets(mets, refs=['line'])
+        xml_out = tei.tostring()
+        texts.append(etree.fromstring(xml_out).find('tei:text', NS).xpath('string()').split())
+    assert texts[0] == texts[1]
+    body = xml_out.split(b'<body>')[1].split(b'</body>')[0]
+    assert b'\n<lb n="' in body and b'\n ' not in body
+    # the header of the skeleton is not indented either
+    assert b'<TEI xmlns="http://www.tei-c.org/ns/1.0"><teiHeader><fileDesc><titleStmt>' in xml_out
+    header = xml_out.split(b'<teiHeader>')[1].split(b'</teiHeader>')[0]
+    assert b'<msIdentifier><idno><idno type="shelfmark">' in header
+    assert b'\n' not in header
+    # also when streaming
+    tei = Tei(compact=True)
+    output = io.BytesIO()
+    tei.fill_from_mets(mets, refs=['line'], output=output)
+    assert output.getvalue() == xml_out
+
+def test_processes(datadir):
+    """
+    Test building pages in worker processes.
+    """
+    from mets_mods2tei import HeadingMatcher
+
+    results = []
+    for processes in (0, 2):
+        mets = Mets.read(str(datadir.join('test_mets_nodiv_local.xml')))
+        tei = Tei(matcher=HeadingMatcher(['exact', 'normalized', 'fuzzy']))
+        tei.fill_from_mets(mets, refs=['line'], processes=processes)
+        assert len(tei.alto_map) == 56
+        assert all((alto.tree is None) == bool(processes) for alto in tei.alto_map.values())
+        results.append(tei.tostring())
+    assert results[0] == results[1]
+
+def test_page_worker(datadir):
+    """
+    Test that page workers fetch with the settings of the session of the caller, and report its statistics.
+    """
+    import os
+
+    from requests.adapters import Retry
+
+    from mets_mods2tei import HttpSession
+    from mets_mods2tei.api import tei
+
+    session = HttpSession(pool_size=4, retries=Retry(total=5, backoff_factor=0.5))
+    tei._init_page_worker(session.pool_size, session.get_adapter('https://').max_retries)
+    try:
+        assert tei._page_session.pool_size == 4
+        assert tei._page_session.get_adapter('https://').max_retries.total == 5
+        assert tei._page_session.get_adapter('https://').max_retries.backoff_factor == 0.5
+        mets = Mets.read(str(datadir.join('test_mets_nodiv_local.xml')))
+        page, pid, stats = tei._page_in_worker(next(iter(mets.alto_map.values())), mets.wd)
+        assert page[1].startswith(b"<TEI") and pid == os.getpid()
+        assert stats == {'requests': 0, 'connections': 0, 'reused': 0}
+    finally:
+        tei._page_session.close()
+        tei._page_session = None
+
+@pytest.mark.parametrize("text_only", [False, True])
+def test_page_numbering(tmp_path, text_only):
+    """
+    Test numbering pages without image number, and lines without ID, by position.
+    """
+    from lxml import etree
+
+    mets = Mets()
+    mets.wd = str(tmp_path)
+    mets.alto_map = {}
+    mets.img_map = {}
+    for num in range(3):
+        lines = b''.join(b'<TextLine><String CONTENT="Seite %d Zeile %d"/></TextLine>' % (num, line) for line in range(3))
+        tmp_path.joinpath(f"p{num}.xml").write_bytes(
+            b'<alto xmlns="http://www.loc.gov/standards/alto/ns-v4#"><Layout><Page><PrintSpace>'
+            b'<TextBlock ID="TB1"><Shape/>' + lines + b'</TextBlock></PrintSpace></Page></Layout></alto>')
+        mets.alto_map[f"P{num}"] = f"file:p{num}.xml"
+        mets.img_map[f"P{num}"] = f"http://example.org/{num}.jpg"
+    mets.struct_links = {"DIV1": list(mets.alto_map)}
+    mets.page_map = dict.fromkeys(mets.alto_map)
+
+    tei = Tei(text_only=text_only)
+    tei.refs = ['page', 'line']
+    body = tei.tree.xpath('//tei:body', namespaces=NS)[0]
+    etree.SubElement(body, f"{{{NS['tei']}}}div").set("id", "DIV1")
+    tei.add_ocr_text(mets)
+    assert [pb.get("facs") for pb in tei.tree.xpath('//tei:pb', namespaces=NS)] == ["#f0002", "#f0003", "#f0004"]
+    assert [lb.get("n") for lb in tei.tree.xpath('//tei:lb', namespaces=NS)] == ["TB1_0001", "TB1_0002", "TB1_0003"] * 3
+    assert [graphic.get("mimeType") for graphic in tei.tree.xpath('//tei:graphic', namespaces=NS)] == ["image/jpeg"] * 3